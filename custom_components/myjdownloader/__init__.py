@@ -4,36 +4,111 @@ from __future__ import annotations
 
 import asyncio
 from collections import defaultdict
+from collections.abc import AsyncIterator, Iterable, Mapping
 import datetime
 from http.client import HTTPException
 import logging
-
-from myjdapi.exception import MYJDConnectionException
-from myjdapi.myjdapi import Jddevice, Myjdapi, MYJDException
+import time
+from typing import Any
+
+from myjdapi.exception import (
+    MYJDAuthFailedException,
+    MYJDConnectionException,
+    MYJDOfflineException,
+    MYJDSessionException,
+    MYJDTokenInvalidException,
+)
+from myjdapi.myjdapi import Myjdapi, MYJDException
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.util import Throttle
 
 from .const import (
+    CIRCUIT_BREAKER_RETRY_MAX_SECONDS,
+    CIRCUIT_BREAKER_RETRY_MIN_SECONDS,
+    CIRCUIT_BREAKER_THRESHOLD,
+    CONF_ATTRIBUTE_ITEMS,
+    CONF_DIRECT_CONNECTION,
+    CONF_LINK_FIELDS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_PACKAGE_FIELDS,
     DATA_MYJDOWNLOADER_CLIENT,
+    DEFAULT_ATTRIBUTE_ITEMS,
+    DEFAULT_DIRECT_CONNECTION,
+    DEFAULT_LINK_FIELDS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_PACKAGE_FIELDS,
+    DIRECT_CONNECTION_REFRESH_SECONDS,
     DOMAIN as MYJDOWNLOADER_DOMAIN,
+    EVENT_PUBLISHER_DOWNLOADS,
+    EVENT_PUBLISHER_DOWNLOADWATCHDOG,
+    LINK_FIELDS_REQUIRED,
+    LINKS_PAGE_SIZE,
     MYJDAPI_APP_KEY,
+    QUERY_CACHE_TTL_SECONDS,
+    RECONNECT_RETRY_MAX_SECONDS,
+    RECONNECT_RETRY_MIN_SECONDS,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF_SECONDS,
     SCAN_INTERVAL_SECONDS,
     SERVICE_ADD_LINKS,
+    SERVICE_ADD_LINKS_BATCH,
+    SERVICE_QUERY_LINKGRABBER,
+    SERVICE_QUERY_LINKS,
+    SERVICE_QUERY_PACKAGES,
     SERVICE_RESTART_AND_UPDATE,
     SERVICE_RUN_UPDATE_CHECK,
     SERVICE_START_DOWNLOADS,
     SERVICE_STOP_DOWNLOADS,
+    SESSION_MAX_AGE_SECONDS,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY_SECONDS,
+    STORAGE_VERSION,
+)
+from .api import (
+    DOWNLOADS_LINKS_QUERY,
+    DOWNLOADS_PACKAGES_QUERY,
+    MyJDownloaderApi,
+    MyJDownloaderDevice,
+    PooledMyjdapi,
+    build_query,
+    count_response_bytes,
+)
+from .coordinator import (
+    SNAPSHOT_GROUP_PACKAGES,
+    SNAPSHOT_GROUP_STATE,
+    SNAPSHOT_GROUP_STATUS,
+    SNAPSHOT_GROUP_UPDATE,
+    SNAPSHOT_GROUPS,
+    MyJDownloaderDeviceCoordinator,
 )
+from .events import MyJDownloaderEventListener
+from .instrumentation import MyJDownloaderInstrumentation
+from .scheduler import (
+    BREAKER_HALF_OPEN,
+    PRIORITY_BACKGROUND,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    CircuitBreaker,
+    MyJDownloaderScheduler,
+    jittered,
+)
+from .store import MyJDownloaderDeviceStore
+from .websocket_api import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(MYJDOWNLOADER_DOMAIN)
+
 # For your initial PR, limit it to 1 platform.
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
@@ -41,25 +116,130 @@ PLATFORMS: list[Platform] = [
     Platform.UPDATE,
 ]
 
+# myjdapi methods with these prefixes only read state and can be shared
+QUERY_METHOD_PREFIXES = ("get_", "is_", "list_", "query_", "status_")
+# queries with these prefixes return large payloads and may wait for others
+BULK_METHOD_PREFIXES = ("query_",)
+# Myjdapi methods that replace the session token
+SESSION_METHODS = ("connect", "reconnect", "disconnect")
+# snapshot fields changed by commands, any other command may change all of them
+COMMAND_SNAPSHOT_KEYS = {
+    # links added with autostart show up in the downloads
+    "add_links": SNAPSHOT_GROUPS[SNAPSHOT_GROUP_PACKAGES],
+    "disable_downloadSpeedLimit": SNAPSHOT_GROUPS[SNAPSHOT_GROUP_STATUS],
+    "enable_downloadSpeedLimit": SNAPSHOT_GROUPS[SNAPSHOT_GROUP_STATUS],
+    "pause_downloads": (
+        SNAPSHOT_GROUPS[SNAPSHOT_GROUP_STATE] | SNAPSHOT_GROUPS[SNAPSHOT_GROUP_STATUS]
+    ),
+    "restart_and_update": SNAPSHOT_GROUPS[SNAPSHOT_GROUP_UPDATE],
+    "run_update_check": SNAPSHOT_GROUPS[SNAPSHOT_GROUP_UPDATE],
+}
+COMMAND_SNAPSHOT_KEYS_DEFAULT = frozenset().union(*SNAPSHOT_GROUPS.values())
+# errors of an expired session, a reconnect renews it
+SESSION_EXPIRED_EXCEPTIONS = (MYJDSessionException, MYJDTokenInvalidException)
+# errors of a JDownloader that cannot be reached
+UNREACHABLE_EXCEPTIONS = (MYJDConnectionException, MYJDOfflineException)
+
+
+def _query_device_id(func) -> str | None:
+    """Return the id of the JDownloader a myjdapi method talks to, None for the account."""
+    owner = getattr(func, "__self__", None)
+    device = getattr(owner, "device", owner)
+    return getattr(device, "device_id", None)
+
+
+def _method_name(func) -> str:
+    """Return the name of a myjdapi method, with the area it belongs to."""
+    return getattr(func, "__qualname__", None) or repr(func)
+
+
+def _is_query(func) -> bool:
+    """Return True if the myjdapi method does not change any state."""
+    return getattr(func, "__name__", "").startswith(QUERY_METHOD_PREFIXES)
+
+
+def _priority(func) -> int:
+    """Return the scheduling priority of a myjdapi method."""
+    if not _is_query(func):
+        return PRIORITY_INTERACTIVE
+    if func.__name__.startswith(BULK_METHOD_PREFIXES):
+        return PRIORITY_BULK
+    return PRIORITY_BACKGROUND
+
+
+def _is_session_change(func) -> bool:
+    """Return True if the myjdapi method replaces the session."""
+    return isinstance(getattr(func, "__self__", None), Myjdapi) and (
+        func.__name__ in SESSION_METHODS
+    )
+
 
 class MyJDownloaderHub:
     """A MyJDownloader Hub wrapper class."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        options: Mapping[str, Any] | None = None,
+        entry_id: str | None = None,
+    ) -> None:
         """Initialize the MyJDownloader hub."""
+        options = options or {}
         self._hass = hass
+        # devices and snapshots of the last run, only for set up entries
+        self._storage: Store[dict[str, Any]] | None = (
+            Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry_id}")
+            if entry_id is not None
+            else None
+        )
+        self._restored_device_ids: set[str] = set()
+        self._cache_save_pending = False
+        # wall clock time, as it is compared with the time of a previous run
+        self._session_refreshed_at = 0.0
+        self._session_generation = 0
+        self._session_lock = asyncio.Lock()
+        self._credentials: tuple[str, str] | None = None
+        self._breakers: dict[str, CircuitBreaker] = defaultdict(
+            lambda: CircuitBreaker(
+                CIRCUIT_BREAKER_THRESHOLD,
+                CIRCUIT_BREAKER_RETRY_MIN_SECONDS,
+                CIRCUIT_BREAKER_RETRY_MAX_SECONDS,
+            )
+        )
         self._websession = async_get_clientsession(self._hass)
-        self._sem = asyncio.Semaphore(1)  # API calls need to be sequential
-        self.myjd = Myjdapi()
+        # API calls are sequential per JDownloader and for the account
+        self._scheduler = MyJDownloaderScheduler(
+            options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+        )
+        self._direct_connection = options.get(
+            CONF_DIRECT_CONNECTION, DEFAULT_DIRECT_CONNECTION
+        )
+        self._direct_connection_checked_at: dict[str, float] = {}
+        self._link_fields = options.get(CONF_LINK_FIELDS, DEFAULT_LINK_FIELDS)
+        self._package_fields = options.get(CONF_PACKAGE_FIELDS, DEFAULT_PACKAGE_FIELDS)
+        self.attribute_items = options.get(
+            CONF_ATTRIBUTE_ITEMS, DEFAULT_ATTRIBUTE_ITEMS
+        )
+        self.myjd = PooledMyjdapi()
         self.myjd.set_app_key(MYJDAPI_APP_KEY)
-        self._devices: dict[str, Jddevice] = {}
+        self.api = MyJDownloaderApi(self._hass, self.myjd)
+        self._devices: dict[str, MyJDownloaderDevice] = {}
+        self.coordinators: dict[str, MyJDownloaderDeviceCoordinator] = {}
+        self.stores: dict[str, MyJDownloaderDeviceStore] = {}
+        self._event_listeners: dict[str, MyJDownloaderEventListener] = {}
         self.devices_platforms: dict[str, set] = defaultdict(lambda: set())
+        self._inflight_queries: dict[tuple, asyncio.Task] = {}
+        self._query_cache: dict[str | None, dict[tuple, tuple[float, Any]]] = (
+            defaultdict(dict)
+        )
+        self._query_generation: dict[str | None, int] = defaultdict(int)
+        self.instrumentation = MyJDownloaderInstrumentation()
 
     @Throttle(datetime.timedelta(seconds=SCAN_INTERVAL_SECONDS))
     async def authenticate(self, email, password) -> bool:
         """Authenticate with Myjdapi."""
         try:
-            async with self._sem:
+            async with self._scheduler.lane(None, exclusive=True):
                 await self._hass.async_add_executor_job(
                     self.myjd.connect, email, password
                 )
@@ -67,18 +247,249 @@ class MyJDownloaderHub:
             _LOGGER.error("Failed to connect to MyJDownloader")
             raise exception
 
+        self._credentials = (email, password)
+        self._session_refreshed_at = time.time()
+        self._session_generation += 1
+        await self.async_save_cache()
         return self.myjd.is_connected()
 
+    async def async_connect(self, email: str, password: str) -> bool:
+        """Resume the cached session if it is still valid, log in otherwise."""
+        if self.myjd.is_connected():
+            try:
+                await self._async_update_devices()
+            except MYJDException:
+                _LOGGER.debug("Cached MyJDownloader session expired, logging in")
+            else:
+                return True
+
+        if not await self.authenticate(email, password, no_throttle=True):
+            return False
+        await self._async_update_devices()
+        return True
+
     async def async_query(self, func, *args, **kwargs):
-        """Perform query while ensuring sequentiality of API calls."""
-        # TODO catch exceptions, retry once with reconnect, then connect, then reauth if invalid_auth maybe with self.myjd.is_connected()
+        """Perform query while ensuring sequentiality of API calls.
+
+        Identical concurrent queries share a single API call and their result
+        is reused for a few seconds, except for bulk queries, whose large
+        results are only held by their callers. Any other call invalidates the
+        cached results of its JDownloader.
+        """
+        device_id = _query_device_id(func)
+        if not _is_query(func):
+            self._invalidate_queries(device_id)
+            try:
+                return await self._async_execute(func, *args, **kwargs)
+            finally:
+                self._invalidate_queries(device_id)
+                if (coordinator := self.coordinators.get(device_id)) is not None:
+                    # the state may have changed, poll fast again
+                    coordinator.reset_update_interval()
+                    coordinator.async_mark_dirty(
+                        COMMAND_SNAPSHOT_KEYS.get(
+                            getattr(func, "__name__", ""), COMMAND_SNAPSHOT_KEYS_DEFAULT
+                        )
+                    )
+
+        key = (func.__qualname__, repr(args), repr(sorted(kwargs.items())))
+        if (cached := self._cached_result(device_id, key)) is not None:
+            return cached[1]
+
+        inflight_key = (device_id, *key)
+        if (task := self._inflight_queries.get(inflight_key)) is None:
+            task = self._hass.loop.create_task(
+                self._async_execute(func, *args, **kwargs)
+            )
+            self._inflight_queries[inflight_key] = task
+            generation = self._query_generation[device_id]
+            bulk = _priority(func) == PRIORITY_BULK
+            task.add_done_callback(
+                lambda task: self._async_query_done(
+                    inflight_key, generation, bulk, task
+                )
+            )
+        return await asyncio.shield(task)
+
+    def _async_query_done(
+        self, inflight_key: tuple, generation: int, bulk: bool, task: asyncio.Task
+    ) -> None:
+        """Cache the result of a finished query, unless it is a bulk query."""
+        # an invalidation may have replaced the query with a newer one
+        if self._inflight_queries.get(inflight_key) is task:
+            del self._inflight_queries[inflight_key]
+        device_id, *key = inflight_key
+        if not bulk and not task.cancelled() and task.exception() is None:
+            self._cache_result(device_id, tuple(key), generation, task.result())
+
+    def _cache_result(
+        self, device_id: str | None, key: tuple, generation: int, result: Any
+    ) -> None:
+        """Cache a result for a few seconds, dropping expired ones."""
+        # do not cache results that may predate a state changing call
+        if generation != self._query_generation[device_id]:
+            return
+        now = time.monotonic()
+        cache = self._query_cache[device_id]
+        for expired in [key for key, (expiry, _) in cache.items() if expiry <= now]:
+            del cache[expired]
+        cache[key] = (now + QUERY_CACHE_TTL_SECONDS, result)
+
+    def _cached_result(
+        self, device_id: str | None, key: tuple
+    ) -> tuple[float, Any] | None:
+        """Return the expiry and a cached result that did not expire yet."""
+        cached = self._query_cache[device_id].get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached
+        return None
+
+    async def async_cached_response(
+        self, device_id: str, key: tuple, func, *args, **kwargs
+    ) -> Any:
+        """Return a recent response of a query service, or compute it.
+
+        Responses are small, filtered views of bulk queries and are dropped
+        with the other cached results of the JDownloader.
+        """
+        key = ("response", *key)
+        if (cached := self._cached_result(device_id, key)) is not None:
+            return cached[1]
+        generation = self._query_generation[device_id]
+        response = await func(*args, **kwargs)
+        self._cache_result(device_id, key, generation, response)
+        return response
+
+    def _invalidate_queries(self, device_id: str | None) -> None:
+        """Drop cached and in-flight query results of a JDownloader or the account.
+
+        Running queries still answer their callers, but later callers start a
+        new query instead of joining them, and their results are not cached.
+        """
+        self._query_generation[device_id] += 1
+        self._query_cache.pop(device_id, None)
+        for inflight_key in [
+            key for key in self._inflight_queries if key[0] == device_id
+        ]:
+            del self._inflight_queries[inflight_key]
+
+    async def _async_execute(self, func, *args, **kwargs):
+        """Run an API call, retrying queries and renewing an expired session.
+
+        Calls to a JDownloader that keeps failing are rejected by its circuit
+        breaker until the next probe is due.
+        """
+        device_id = _query_device_id(func)
+        breaker = self._breakers[device_id] if device_id is not None else None
+        if breaker is not None and not breaker.allow():
+            self.instrumentation.record_rejected(device_id, _method_name(func))
+            raise MYJDConnectionException(
+                f"JDownloader ({device_id}) unreachable, "
+                f"retrying in {breaker.retry_in:.0f} s\n"
+            )
+        # a call let through a breaker that is not closed is its probe
+        probing = breaker is not None and breaker.state == BREAKER_HALF_OPEN
+
+        attempt = 0
+        session_renewed = False
         try:
-            async with self._sem:
-                return await self._hass.async_add_executor_job(func, *args, **kwargs)
-        except MYJDConnectionException as ex:
-            # update list of online devices out of order if device is not reachable
-            await self.async_update_devices(no_throttle=True)
-            raise ex
+            while True:
+                session_generation = self._session_generation
+                try:
+                    result = await self._async_call(func, *args, **kwargs)
+                except SESSION_EXPIRED_EXCEPTIONS:
+                    if session_renewed or _is_session_change(func):
+                        self._record_reached(breaker)
+                        raise
+                    session_renewed = True
+                    await self._async_renew_session(session_generation)
+                except UNREACHABLE_EXCEPTIONS:
+                    if not _is_query(func) or attempt >= RETRY_ATTEMPTS:
+                        self._record_unreachable(device_id, breaker)
+                        raise
+                    await asyncio.sleep(jittered(RETRY_BACKOFF_SECONDS * 2**attempt))
+                    attempt += 1
+                except MYJDException:
+                    self._record_reached(breaker)
+                    raise
+                else:
+                    self._record_reached(breaker)
+                    return result
+        finally:
+            # give a probe back that ended without a result, e.g. cancelled,
+            # failed to renew the session or raised an unexpected error
+            if probing:
+                breaker.release()
+
+    async def _async_call(self, func, *args, **kwargs):
+        """Run an API call on its lane, blocking myjdapi calls in the executor.
+
+        Calls that got a slot are recorded by the instrumentation.
+        """
+        device_id = _query_device_id(func)
+        started_at: float | None = None
+        exception: BaseException | None = None
+        with count_response_bytes() as payload:
+            try:
+                async with self._scheduler.lane(
+                    device_id,
+                    exclusive=_is_session_change(func),
+                    priority=_priority(func),
+                ) as wait:
+                    started_at = time.monotonic()
+                    if asyncio.iscoroutinefunction(func):
+                        return await func(*args, **kwargs)
+                    return await self._hass.async_add_executor_job(
+                        func, *args, **kwargs
+                    )
+            except BaseException as ex:  # myjdapi errors derive from BaseException
+                exception = ex
+                raise
+            finally:
+                if started_at is not None:
+                    self.instrumentation.record(
+                        device_id,
+                        _method_name(func),
+                        wait,
+                        time.monotonic() - started_at,
+                        payload[0],
+                        exception,
+                    )
+
+    @staticmethod
+    def _record_reached(breaker: CircuitBreaker | None) -> None:
+        """Close the breaker of a JDownloader that responded."""
+        if breaker is not None:
+            breaker.record_success()
+
+    def _record_unreachable(
+        self, device_id: str | None, breaker: CircuitBreaker | None
+    ) -> None:
+        """Count a failure, check the online devices once the breaker opens."""
+        if breaker is None or not breaker.record_failure():
+            return
+        _LOGGER.debug(
+            "JDownloader (%s) unreachable, retrying in %.0f s",
+            device_id,
+            breaker.retry_in,
+        )
+        self._hass.async_create_background_task(
+            self.async_update_devices(no_throttle=True),
+            f"{MYJDOWNLOADER_DOMAIN}_update_devices",
+        )
+
+    async def _async_renew_session(self, session_generation: int) -> None:
+        """Reconnect, or log in again if that fails, unless another call did."""
+        async with self._session_lock:
+            if self._session_generation != session_generation:
+                return
+            try:
+                await self._async_reconnect()
+            except MYJDException:
+                if self._credentials is None:
+                    raise
+                _LOGGER.debug("Reconnecting to MyJDownloader failed, logging in")
+                await self.authenticate(*self._credentials, no_throttle=True)
 
     @Throttle(
         datetime.timedelta(seconds=SCAN_INTERVAL_SECONDS),
@@ -86,43 +497,347 @@ class MyJDownloaderHub:
     )
     async def async_update_devices(self, *args, **kwargs):
         """Update list of online devices."""
+        return await self._async_update_devices()
+
+    async def _async_update_devices(self):
+        """Update list of online devices, unthrottled."""
 
-        # We need to reconnect to the API to query the list of active JDownloaders
-        await self.async_query(self.myjd.reconnect)  # TODO move to async query
-        await self.async_query(self.myjd.update_devices)
+        # renew the session before it expires, instead of on every update
+        if time.time() - self._session_refreshed_at > SESSION_MAX_AGE_SECONDS:
+            await self._async_reconnect()
 
-        # add Jddevice objects for all online JDownloaders, if not exist
+        # add device objects for all online JDownloaders, if not exist
         new_devices = {}
-        available_device_infos = await self.async_query(self.myjd.list_devices)
+        available_device_infos = await self.async_query(self.api.list_devices)
         for device_info in available_device_infos:
-            if device_info["id"] not in self._devices:
+            if device_info["id"] in self._restored_device_ids:
+                # restored from the cache, replace it with what the cloud knows
+                self._restored_device_ids.discard(device_info["id"])
+                new_devices[device_info["id"]] = MyJDownloaderDevice(
+                    self.api, device_info
+                )
+            elif device_info["id"] not in self._devices:
                 _LOGGER.debug("JDownloader (%s) is online", device_info["name"])
-                new_devices.update(
-                    {
-                        device_info["id"]: await self.async_query(
-                            self.myjd.get_device, None, device_info["id"]
-                        )
-                    }
+                new_devices[device_info["id"]] = MyJDownloaderDevice(
+                    self.api, device_info
                 )
         if new_devices:
             self._devices.update(new_devices)
+            # fetch an initial snapshot, so entities start with data
+            for device_id in new_devices:
+                if device_id not in self.coordinators:
+                    self.coordinators[device_id] = MyJDownloaderDeviceCoordinator(
+                        self._hass, self, device_id
+                    )
+                    self.stores[device_id] = MyJDownloaderDeviceStore()
+            await asyncio.gather(
+                *(
+                    self.coordinators[device_id].async_refresh()
+                    for device_id in new_devices
+                )
+            )
             async_dispatcher_send(self._hass, f"{MYJDOWNLOADER_DOMAIN}_new_devices")
+            for device_id, device in new_devices.items():
+                listener = MyJDownloaderEventListener(self._hass, self, device)
+                self._event_listeners[device_id] = listener
+                listener.start()
 
         # remove JDownloader objects, that are not online anymore
+        available_device_ids = {device["id"] for device in available_device_infos}
         unavailable_device_ids = [
             device_id
             for device_id in self._devices
-            if device_id not in [device["id"] for device in available_device_infos]
+            if device_id not in available_device_ids
         ]
         for device_id in unavailable_device_ids:
             _LOGGER.debug("JDownloader (%s) is offline", self._devices[device_id].name)
             del self._devices[device_id]
+            self._restored_device_ids.discard(device_id)
+            self._scheduler.remove_lane(device_id)
+            self._breakers.pop(device_id, None)
+            self._direct_connection_checked_at.pop(device_id, None)
+            if (listener := self._event_listeners.pop(device_id, None)) is not None:
+                self._hass.async_create_background_task(
+                    listener.async_stop(),
+                    f"{MYJDOWNLOADER_DOMAIN}_events_stop_{device_id}",
+                )
 
-        # TODO additionally trigger update of sensor for number of devices immediately
-        # http://dev-docs.home-assistant.io/en/master/api/helpers.html#module-homeassistant.helpers.dispatcher
+        if self._direct_connection:
+            now = time.monotonic()
+            for device_id, device in self._devices.items():
+                checked_at = self._direct_connection_checked_at.get(device_id)
+                if checked_at is None or now - checked_at > (
+                    DIRECT_CONNECTION_REFRESH_SECONDS
+                ):
+                    self._direct_connection_checked_at[device_id] = now
+                    self._hass.async_create_background_task(
+                        self._async_update_direct_connection(device),
+                        f"{MYJDOWNLOADER_DOMAIN}_direct_connection_{device_id}",
+                    )
+
+        if new_devices or unavailable_device_ids:
+            self.async_schedule_cache_save()
+            async_dispatcher_send(self._hass, f"{MYJDOWNLOADER_DOMAIN}_devices_changed")
 
         return self._devices
 
+    async def _async_reconnect(self) -> None:
+        """Renew the session with the regain token."""
+        await self.async_query(self.myjd.reconnect)
+        self._session_refreshed_at = time.time()
+        self._session_generation += 1
+        await self.async_save_cache()
+
+    async def async_load_cache(self) -> bool:
+        """Restore the session and devices, return True if any devices were cached.
+
+        Restored devices are used until the cloud confirms them in the next
+        update of the devices.
+        """
+        if self._storage is None or not (cache := await self._storage.async_load()):
+            return False
+
+        if (session := cache.get("session")) is not None:
+            self.api.restore_session(session)
+            self._session_refreshed_at = cache.get("session_refreshed_at", 0.0)
+
+        for device_info in cache.get("devices", []):
+            device_id = device_info["id"]
+            self._devices[device_id] = MyJDownloaderDevice(self.api, device_info)
+            self._restored_device_ids.add(device_id)
+            coordinator = MyJDownloaderDeviceCoordinator(self._hass, self, device_id)
+            store = MyJDownloaderDeviceStore()
+            if (snapshot := cache.get("snapshots", {}).get(device_id)) is not None:
+                coordinator.data = snapshot["data"]
+                store.packages.start()
+                store.packages.add(snapshot["packages"])
+                store.packages.finish()
+            self.coordinators[device_id] = coordinator
+            self.stores[device_id] = store
+        return bool(self._devices)
+
+    @callback
+    def async_schedule_cache_save(self) -> None:
+        """Save devices and snapshots to the cache soon.
+
+        A pending save is not delayed again, otherwise polling more often
+        than the save delay would postpone it forever.
+        """
+        if self._storage is not None and not self._cache_save_pending:
+            self._cache_save_pending = True
+            self._storage.async_delay_save(self._cache_data, STORAGE_SAVE_DELAY_SECONDS)
+
+    async def async_save_cache(self) -> None:
+        """Save devices, snapshots and the session to the cache now."""
+        if self._storage is not None:
+            await self._storage.async_save(self._cache_data())
+
+    @callback
+    def _cache_data(self) -> dict[str, Any]:
+        """Return the devices and their last snapshot to cache."""
+        # a save replaces any pending one
+        self._cache_save_pending = False
+        snapshots = {}
+        for device_id in self._devices:
+            coordinator = self.coordinators.get(device_id)
+            if coordinator is None or coordinator.data is None:
+                continue
+            packages = self.stores[device_id].packages
+            snapshots[device_id] = {
+                "data": coordinator.data,
+                "packages": [packages.render(row) for row in range(len(packages))],
+            }
+        return {
+            "devices": [
+                {"id": device_id, "name": device.name, "type": device.device_type}
+                for device_id, device in self._devices.items()
+            ],
+            "snapshots": snapshots,
+            "session": self.api.export_session(),
+            "session_refreshed_at": self._session_refreshed_at,
+        }
+
+    async def async_reconcile(self, email: str, password: str) -> None:
+        """Connect in the background and reconcile the restored devices."""
+        retry_in = RECONNECT_RETRY_MIN_SECONDS
+        while True:
+            try:
+                if await self.async_connect(email, password):
+                    return
+            except MYJDAuthFailedException:
+                _LOGGER.error("MyJDownloader rejected the credentials")
+                return
+            except MYJDException:
+                pass
+            _LOGGER.debug("Reconnecting to MyJDownloader in %s s", retry_in)
+            await asyncio.sleep(retry_in)
+            retry_in = min(retry_in * 2, RECONNECT_RETRY_MAX_SECONDS)
+
+    async def _async_update_direct_connection(
+        self, device: MyJDownloaderDevice
+    ) -> None:
+        """Find a reachable local endpoint of a JDownloader."""
+        try:
+            infos = await self.async_query(device.get_direct_connection_infos)
+        except MYJDException:
+            _LOGGER.debug(
+                "Failed to query direct connections of JDownloader (%s)", device.name
+            )
+            return
+
+        for info in infos:
+            api = f"http://{info['ip']}:{info['port']}"
+            if await device.async_probe_direct_api(api):
+                if device.direct_api != api:
+                    _LOGGER.debug(
+                        "JDownloader (%s) is directly reachable at %s", device.name, api
+                    )
+                    device.set_direct_api(api)
+                return
+        device.set_direct_api(None)
+
+    @callback
+    def async_handle_events(self, device_id: str, events: list[dict]) -> None:
+        """Push events of a JDownloader to its entities."""
+        self._invalidate_queries(device_id)
+        async_dispatcher_send(
+            self._hass, f"{MYJDOWNLOADER_DOMAIN}_events_{device_id}", events
+        )
+        coordinator = self.coordinators.get(device_id)
+        if coordinator is not None and any(
+            event.get("publisher")
+            in (EVENT_PUBLISHER_DOWNLOADS, EVENT_PUBLISHER_DOWNLOADWATCHDOG)
+            for event in events
+        ):
+            self._hass.async_create_task(coordinator.async_request_refresh())
+
+    @callback
+    def async_event_stream_changed(self, device_id: str) -> None:
+        """Poll a JDownloader slower while its events arrive."""
+        if (coordinator := self.coordinators.get(device_id)) is not None:
+            connected = self.events_connected(device_id)
+            coordinator.set_events_connected(connected)
+            if not connected and device_id in self._event_listeners:
+                # do not wait for the slow fallback poll
+                self._hass.async_create_task(coordinator.async_request_refresh())
+
+    def events_connected(self, device_id: str) -> bool:
+        """Return True if events of a JDownloader arrive."""
+        listener = self._event_listeners.get(device_id)
+        return listener is not None and listener.connected
+
+    def build_links_query(
+        self,
+        package_uuids: list[int] | None = None,
+        start_at: int = 0,
+        max_results: int = -1,
+    ) -> list[dict[str, Any]]:
+        """Return the parameters of queryLinks for the configured fields."""
+        return [
+            build_query(
+                DOWNLOADS_LINKS_QUERY,
+                # links seen in the download list are not submitted again
+                {*self._link_fields, *LINK_FIELDS_REQUIRED},
+                packageUUIDs=package_uuids or [],
+                startAt=start_at,
+                maxResults=max_results,
+            )
+        ]
+
+    async def async_iter_links(
+        self, device: MyJDownloaderDevice, package_uuids: list[int] | None = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Query the links of a JDownloader page by page."""
+        async for page in self.async_iter_pages(
+            device.downloads.query_links, self.build_links_query(package_uuids)[0]
+        ):
+            yield page
+
+    async def async_iter_pages(
+        self, func, query: dict[str, Any]
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Run a query of links or packages page by page."""
+        start_at = 0
+        while True:
+            page = await self.async_query(
+                func, [query | {"startAt": start_at, "maxResults": LINKS_PAGE_SIZE}]
+            )
+            if page:
+                yield page
+            if len(page or ()) < LINKS_PAGE_SIZE:
+                return
+            start_at += LINKS_PAGE_SIZE
+
+    def build_packages_query(
+        self, package_uuids: list[int] | None = None, fields: Iterable[str] = ()
+    ) -> list[dict[str, Any]]:
+        """Return the parameters of queryPackages for the configured fields.
+
+        The coordinator adds the fields the derived sensors need.
+        """
+        return [
+            build_query(
+                DOWNLOADS_PACKAGES_QUERY,
+                {*self._package_fields, *fields},
+                packageUUIDs=package_uuids or [],
+            )
+        ]
+
+    @property
+    def link_fields(self) -> list[str]:
+        """Return the configured fields of links."""
+        return list(self._link_fields)
+
+    @property
+    def package_fields(self) -> list[str]:
+        """Return the configured fields of packages."""
+        return list(self._package_fields)
+
+    @property
+    def connection_stats(self) -> dict[str, dict[str, Any]]:
+        """Return request and connection reuse counters of both transports."""
+        return {
+            "api": self.api.stats.as_dict(),
+            "myjdapi": self.myjd.stats.as_dict(),
+        }
+
+    @property
+    def queue_stats(self) -> dict[str, dict[str, Any]]:
+        """Return queue wait times of API calls per priority."""
+        return self._scheduler.stats
+
+    @property
+    def circuit_breaker_stats(self) -> dict[str, dict[str, Any]]:
+        """Return the state of the circuit breaker per JDownloader."""
+        return {
+            device_id: breaker.as_dict()
+            for device_id, breaker in self._breakers.items()
+        }
+
+    @property
+    def api_call_stats(self) -> dict[str, dict[str, Any]]:
+        """Return calls, errors and time histograms per JDownloader and method."""
+        return self.instrumentation.as_dict()
+
+    @property
+    def url_index_stats(self) -> dict[str, dict[str, int]]:
+        """Return the URLs known and skipped per JDownloader."""
+        return {
+            device_id: store.urls.as_dict() for device_id, store in self.stores.items()
+        }
+
+    async def async_close(self) -> None:
+        """Close the connections of the hub and save the cache."""
+        if self._storage is not None:
+            await self._storage.async_save(self._cache_data())
+        listeners = list(self._event_listeners.values())
+        self._event_listeners.clear()
+        await asyncio.gather(*(listener.async_stop() for listener in listeners))
+        for coordinator in self.coordinators.values():
+            await coordinator.async_shutdown()
+        await self.api.async_close()
+        self.myjd.close()
+
     @property
     def devices(self):
         """Get dictionary of device ids and objects."""
@@ -145,6 +860,12 @@ class MyJDownloaderHub:
             raise HTTPException("Request failed")
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the MyJDownloader websocket API."""
+    async_register_websocket_commands(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MyJDownloader from a config entry."""
 
@@ -153,22 +874,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         DATA_MYJDOWNLOADER_CLIENT: None
     }
 
-    # initial connection
-    hub = MyJDownloaderHub(hass)
-    try:
-        if not await hub.authenticate(
-            entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD]
-        ):
-            raise ConfigEntryNotReady
-    except MYJDException as exception:
-        raise ConfigEntryNotReady from exception
-
-    await hub.async_update_devices()  # get initial list of JDownloaders
+    hub = MyJDownloaderHub(hass, entry.options, entry.entry_id)
+    if await hub.async_load_cache():
+        # entities come up from the cache, connect in the background
+        entry.async_create_background_task(
+            hass,
+            hub.async_reconcile(entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD]),
+            f"{MYJDOWNLOADER_DOMAIN}_reconcile_{entry.entry_id}",
+        )
+    else:
+        # initial connection and list of JDownloaders
+        try:
+            if not await hub.async_connect(
+                entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD]
+            ):
+                raise ConfigEntryNotReady
+        except MYJDException as exception:
+            raise ConfigEntryNotReady from exception
     hass.data.setdefault(MYJDOWNLOADER_DOMAIN, {})[entry.entry_id][
         DATA_MYJDOWNLOADER_CLIENT
     ] = hub
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     # Services are defined in MyJDownloaderDeviceEntity and
     # registered in setup of sensor platform.
@@ -185,13 +913,30 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.services.async_remove(MYJDOWNLOADER_DOMAIN, SERVICE_START_DOWNLOADS)
     hass.services.async_remove(MYJDOWNLOADER_DOMAIN, SERVICE_STOP_DOWNLOADS)
     hass.services.async_remove(MYJDOWNLOADER_DOMAIN, SERVICE_ADD_LINKS)
+    hass.services.async_remove(MYJDOWNLOADER_DOMAIN, SERVICE_ADD_LINKS_BATCH)
+    hass.services.async_remove(MYJDOWNLOADER_DOMAIN, SERVICE_QUERY_LINKGRABBER)
+    hass.services.async_remove(MYJDOWNLOADER_DOMAIN, SERVICE_QUERY_LINKS)
+    hass.services.async_remove(MYJDOWNLOADER_DOMAIN, SERVICE_QUERY_PACKAGES)
 
     # unload platforms
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[MYJDOWNLOADER_DOMAIN].pop(entry.entry_id)
+        hub = hass.data[MYJDOWNLOADER_DOMAIN].pop(entry.entry_id)[
+            DATA_MYJDOWNLOADER_CLIENT
+        ]
+        await hub.async_close()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cache of a config entry."""
+    await Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}").async_remove()
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 class JDownloaderOfflineException(Exception):
     """JDownloader offline exception."""
@@ -0,0 +1,770 @@
+"""Asynchronous transport for the MyJDownloader API."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import hashlib
+import hmac
+import json
+import logging
+import time
+from types import FunctionType
+from typing import Any
+from urllib.parse import quote
+
+import aiohttp
+from Crypto.Cipher import AES
+from myjdapi import myjdapi as myjdapi_module
+from myjdapi.exception import (
+    MYJDApiException,
+    MYJDConnectionException,
+    MYJDDecodeException,
+    MYJDException,
+)
+from myjdapi.myjdapi import Myjdapi
+import requests
+from requests.adapters import HTTPAdapter
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant
+from homeassistant.util.ssl import client_context
+
+from .const import (
+    API_KEEPALIVE_SECONDS,
+    API_POOL_SIZE,
+    API_TIMEOUT_SECONDS,
+    API_URL,
+    API_VERSION,
+    DECODE_IN_EXECUTOR_MIN_BYTES,
+    DIRECT_CONNECTION_COOLDOWN_SECONDS,
+    DIRECT_CONNECTION_TIMEOUT_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# tokens of a Myjdapi session, the secrets and encryption tokens are bytes
+SESSION_TOKENS = (
+    "device_encryption_token",
+    "device_secret",
+    "login_secret",
+    "regain_token",
+    "server_encryption_token",
+    "session_token",
+)
+SESSION_STRING_TOKENS = ("regain_token", "session_token")
+
+# bytes of the responses received by the API call running in the context
+_response_bytes: ContextVar[list[int] | None] = ContextVar(
+    "response_bytes", default=None
+)
+
+BLOCK_SIZE = 16
+CONTENT_TYPE = "application/aesjson-jd; charset=utf-8"
+
+# default queries of myjdapi, they request all fields
+DOWNLOADS_LINKS_QUERY = {
+    "addedDate": True,
+    "bytesLoaded": True,
+    "bytesTotal": True,
+    "comment": True,
+    "enabled": True,
+    "eta": True,
+    "extractionStatus": True,
+    "finished": True,
+    "finishedDate": True,
+    "host": True,
+    "jobUUIDs": [],
+    "maxResults": -1,
+    "packageUUIDs": [],
+    "password": True,
+    "priority": True,
+    "running": True,
+    "skipped": True,
+    "speed": True,
+    "startAt": 0,
+    "status": True,
+    "url": True,
+}
+
+DOWNLOADS_PACKAGES_QUERY = {
+    "bytesLoaded": True,
+    "bytesTotal": True,
+    "childCount": True,
+    "comment": True,
+    "enabled": True,
+    "eta": True,
+    "finished": True,
+    "hosts": True,
+    "maxResults": -1,
+    "packageUUIDs": [],
+    "priority": True,
+    "running": True,
+    "saveTo": True,
+    "speed": True,
+    "startAt": 0,
+    "status": True,
+}
+
+# optional fields of links and packages, uuid and name are always returned
+DOWNLOADS_LINKS_FIELDS = sorted(
+    key for key, value in DOWNLOADS_LINKS_QUERY.items() if isinstance(value, bool)
+)
+DOWNLOADS_PACKAGES_FIELDS = sorted(
+    key for key, value in DOWNLOADS_PACKAGES_QUERY.items() if isinstance(value, bool)
+)
+
+LINKGRABBER_LINKS_QUERY = {
+    "bytesTotal": True,
+    "comment": True,
+    "status": True,
+    "enabled": True,
+    "maxResults": -1,
+    "startAt": 0,
+    "hosts": True,
+    "url": True,
+    "availability": True,
+    "variantIcon": True,
+    "variantName": True,
+    "variantID": True,
+    "variants": True,
+    "priority": True,
+}
+LINKGRABBER_LINKS_FIELDS = sorted(
+    key for key, value in LINKGRABBER_LINKS_QUERY.items() if isinstance(value, bool)
+)
+
+
+def build_query(
+    query: dict[str, Any], fields: Iterable[str], **kwargs: Any
+) -> dict[str, Any]:
+    """Return a query that only requests the given optional fields."""
+    fields = set(fields)
+    return {
+        key: key in fields if isinstance(value, bool) else value
+        for key, value in query.items()
+    } | kwargs
+
+
+@contextmanager
+def count_response_bytes() -> Iterator[list[int]]:
+    """Count the bytes of the responses received within the context.
+
+    Only responses of this transport are counted, myjdapi calls running in
+    the executor do not see the context.
+    """
+    counter = [0]
+    token = _response_bytes.set(counter)
+    try:
+        yield counter
+    finally:
+        _response_bytes.reset(token)
+
+
+def _pad(data: bytes) -> bytes:
+    """Pad data to the AES block size (PKCS#7)."""
+    length = BLOCK_SIZE - len(data) % BLOCK_SIZE
+    return data + bytes([length]) * length
+
+
+def _unpad(data: bytes) -> bytes:
+    """Remove the PKCS#7 padding."""
+    return data[: -data[-1]]
+
+
+def _encrypt(secret_token: bytes, data: str) -> str:
+    """Encrypt data with the first half of the token as IV, the second as key."""
+    init_vector = secret_token[: len(secret_token) // 2]
+    key = secret_token[len(secret_token) // 2 :]
+    encryptor = AES.new(key, AES.MODE_CBC, init_vector)
+    return base64.b64encode(encryptor.encrypt(_pad(data.encode("utf-8")))).decode(
+        "utf-8"
+    )
+
+
+def _decrypt(secret_token: bytes, data: str) -> bytes:
+    """Decrypt data with the first half of the token as IV, the second as key."""
+    init_vector = secret_token[: len(secret_token) // 2]
+    key = secret_token[len(secret_token) // 2 :]
+    decryptor = AES.new(key, AES.MODE_CBC, init_vector)
+    return _unpad(decryptor.decrypt(base64.b64decode(data)))
+
+
+def _decode(secret_token: bytes, data: str) -> dict[str, Any]:
+    """Decrypt and parse a response."""
+    return json.loads(_decrypt(secret_token, data).decode("utf-8"))
+
+
+def _sign(key: bytes, data: str) -> str:
+    """Sign a server request."""
+    return hmac.new(key, data.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _encode_param(param: Any) -> Any:
+    """Encode an action parameter the way myjdapi does."""
+    if isinstance(param, str | list):
+        return param
+    if isinstance(param, dict | bool):
+        return json.dumps(param)
+    return str(param)
+
+
+class ConnectionStats:
+    """Count requests and the connections opened for them."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.connections = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters and the share of requests on reused connections."""
+        reused = max(self.requests - self.connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.connections,
+            "reused_connections": reused,
+            "reuse_rate": round(reused / self.requests, 3) if self.requests else None,
+        }
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that counts requests and new connections."""
+
+    def __init__(self, stats: ConnectionStats, **kwargs) -> None:
+        """Initialize the adapter."""
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        """Create the pool manager with counting connection pools."""
+        super().init_poolmanager(*args, **kwargs)
+        stats = self._stats
+
+        def counting(pool_class):
+            class CountingConnectionPool(pool_class):
+                def _new_conn(self):
+                    stats.connections += 1
+                    return super()._new_conn()
+
+            return CountingConnectionPool
+
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: counting(pool_class)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, *args, **kwargs):
+        """Send a request."""
+        self._stats.requests += 1
+        return super().send(request, *args, **kwargs)
+
+
+class _PooledRequests:
+    """Stand-in for the requests module used by a Myjdapi object.
+
+    myjdapi calls requests.get and requests.post, which open a new
+    connection (and TLS handshake) for every call. This routes them through
+    one keep-alive session with a bounded pool instead.
+    """
+
+    exceptions = requests.exceptions
+
+    def __init__(self) -> None:
+        """Initialize the pooled session."""
+        self.stats = ConnectionStats()
+        self._session = requests.Session()
+        adapter = _CountingHTTPAdapter(
+            self.stats, pool_connections=1, pool_maxsize=API_POOL_SIZE
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def get(self, url, **kwargs):
+        """Send a GET request."""
+        return self._session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Send a POST request."""
+        return self._session.post(url, **kwargs)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._session.close()
+
+
+class PooledMyjdapi(Myjdapi):
+    """Myjdapi sending its requests over its own keep-alive session.
+
+    request_api of myjdapi looks requests up in the globals of its module.
+    Each instance runs it with a copy of them, in which requests is its own
+    pooled session, so the module stays untouched for other users.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the Myjdapi object and its session."""
+        super().__init__()
+        self.requests = _PooledRequests()
+        request_api = Myjdapi.request_api
+        self._request_api = FunctionType(
+            request_api.__code__,
+            vars(myjdapi_module) | {"requests": self.requests},
+            request_api.__name__,
+            request_api.__defaults__,
+            request_api.__closure__,
+        )
+
+    def request_api(self, *args, **kwargs) -> Any:
+        """Make a request to the API over the pooled session."""
+        return self._request_api(self, *args, **kwargs)
+
+    @property
+    def stats(self) -> ConnectionStats:
+        """Return the request and connection counters of the session."""
+        return self.requests.stats
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.requests.close()
+
+
+class MyJDownloaderApi:
+    """Send MyJDownloader API requests over a pooled aiohttp session.
+
+    Login and session renewal stay with myjdapi, this class borrows the
+    session and encryption tokens of the Myjdapi object for every request.
+    """
+
+    def __init__(self, hass: HomeAssistant, myjd: Myjdapi) -> None:
+        """Initialize the MyJDownloader API transport."""
+        self._hass = hass
+        self._myjd = myjd
+        self._session: aiohttp.ClientSession | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+        self._request_id = 0
+        self.stats = ConnectionStats()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session, create it on first use."""
+        if self._session is None or self._session.closed:
+            trace_config = aiohttp.TraceConfig()
+
+            async def on_request_start(session, context, params) -> None:
+                self.stats.requests += 1
+
+            async def on_connection_create_end(session, context, params) -> None:
+                self.stats.connections += 1
+
+            trace_config.on_request_start.append(on_request_start)
+            trace_config.on_connection_create_end.append(on_connection_create_end)
+            # keep idle connections open across polling cycles
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=API_POOL_SIZE,
+                    keepalive_timeout=API_KEEPALIVE_SECONDS,
+                    ssl=client_context(),
+                ),
+                trace_configs=[trace_config],
+            )
+            # entries are not unloaded on shutdown, close the session anyway
+            if self._unsub_stop is None:
+                self._unsub_stop = self._hass.bus.async_listen_once(
+                    EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+                )
+        return self._session
+
+    async def _async_handle_stop(self, event: Event) -> None:
+        """Close the session when Home Assistant stops."""
+        self._unsub_stop = None
+        await self.async_close()
+
+    async def async_close(self) -> None:
+        """Close the session."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _next_request_id(self) -> int:
+        """Return a unique, increasing request id."""
+        self._request_id = max(int(time.time() * 1000), self._request_id + 1)
+        return self._request_id
+
+    def export_session(self) -> dict[str, str] | None:
+        """Return the tokens of the session to store them, None if not connected."""
+        if not self._myjd.is_connected():
+            return None
+        session = {}
+        for name in SESSION_TOKENS:
+            if (value := self._token(name)) is None:
+                return None
+            session[name] = value.hex() if isinstance(value, bytes) else value
+        return session
+
+    def restore_session(self, session: dict[str, str]) -> None:
+        """Resume a stored session without logging in again."""
+        for name in SESSION_TOKENS:
+            value = session[name]
+            if name not in SESSION_STRING_TOKENS:
+                value = bytes.fromhex(value)
+            setattr(self._myjd, f"_Myjdapi__{name}", value)
+        self._myjd._Myjdapi__connected = True
+
+    def _token(self, name: str) -> Any:
+        """Return a session token of the Myjdapi object."""
+        if not self._myjd.is_connected():
+            raise MYJDConnectionException("No connection established\n")
+        return getattr(self._myjd, f"_Myjdapi__{name}")
+
+    async def _async_decode(self, secret_token: bytes, data: str) -> dict[str, Any]:
+        """Decrypt and parse a response, large ones in the executor."""
+        if len(data) < DECODE_IN_EXECUTOR_MIN_BYTES:
+            return _decode(secret_token, data)
+        return await self._hass.async_add_executor_job(_decode, secret_token, data)
+
+    async def _async_request(
+        self,
+        method: str,
+        url: str,
+        request_id: int,
+        secret_token: bytes,
+        timeout: float = API_TIMEOUT_SECONDS,
+        **kwargs,
+    ) -> dict[str, Any]:
+        """Send a request and return the decrypted response."""
+        try:
+            async with self._get_session().request(
+                method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs
+            ) as resp:
+                text = await resp.text()
+                status = resp.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            raise MYJDConnectionException(f"Request failed: {ex}\n") from ex
+        if (counter := _response_bytes.get()) is not None:
+            counter[0] += len(text)
+
+        if status != 200:
+            try:
+                error = json.loads(text)
+            except json.JSONDecodeError:
+                try:
+                    error = _decode(secret_token, text)
+                except (ValueError, IndexError) as ex:
+                    raise MYJDDecodeException(
+                        f"Failed to decode response: {text}"
+                    ) from ex
+            raise MYJDApiException.get_exception(
+                error["src"], error["type"], f"{error['type']} ({url})"
+            )
+
+        try:
+            response = await self._async_decode(secret_token, text)
+        except (ValueError, IndexError) as ex:
+            raise MYJDDecodeException(f"Failed to decode response: {text}") from ex
+        if response.get("rid") != request_id:
+            raise MYJDConnectionException("No connection established\n")
+        return response
+
+    async def async_request_server(
+        self, path: str, params: list[tuple[str, str]]
+    ) -> dict[str, Any]:
+        """Send a signed request to the MyJDownloader server."""
+        secret_token = self._token("server_encryption_token")
+        request_id = self._next_request_id()
+        query = (
+            path
+            + "?"
+            + "&".join(
+                [f"{key}={quote(value)}" for key, value in params]
+                + [f"rid={request_id}"]
+            )
+        )
+        query += f"&signature={_sign(secret_token, query)}"
+        return await self._async_request(
+            "GET", API_URL + query, request_id, secret_token
+        )
+
+    async def async_action(
+        self,
+        device_id: str,
+        path: str,
+        params: list | tuple | None = None,
+        api: str = API_URL,
+        timeout: float = API_TIMEOUT_SECONDS,
+    ) -> Any:
+        """Call an action on a JDownloader and return its data."""
+        session_token = self._token("session_token")
+        secret_token = self._token("device_encryption_token")
+        request_id = self._next_request_id()
+        data = json.dumps(
+            {
+                "apiVer": API_VERSION,
+                "url": path,
+                "params": [_encode_param(param) for param in params or ()],
+                "rid": request_id,
+            }
+        )
+        # myjdapi removes quotes around null elements, too
+        data = data.replace('"null"', "null")
+        response = await self._async_request(
+            "POST",
+            f"{api}/t_{session_token}_{device_id}{path}",
+            request_id,
+            secret_token,
+            timeout,
+            data=_encrypt(secret_token, data),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+        return response.get("data")
+
+    async def list_devices(self) -> list[dict[str, str]]:
+        """Return the JDownloaders that are currently online."""
+        response = await self.async_request_server(
+            "/my/listdevices", [("sessiontoken", self._token("session_token"))]
+        )
+        return response["list"]
+
+
+class MyJDownloaderDevice:
+    """A JDownloader reached through the asynchronous transport.
+
+    The interface mirrors the parts of myjdapi's Jddevice the integration
+    uses, with coroutines instead of blocking methods.
+    """
+
+    def __init__(self, api: MyJDownloaderApi, device_info: dict[str, str]) -> None:
+        """Initialize the JDownloader."""
+        self.api = api
+        self.name = device_info["name"]
+        self.device_id = device_info["id"]
+        self.device_type = device_info["type"]
+        # local API of the JDownloader, if it is reachable
+        self.direct_api: str | None = None
+        self._direct_api_retry_at = 0.0
+        self.downloadcontroller = DownloadController(self)
+        self.downloads = Downloads(self)
+        self.events = Events(self)
+        self.jd = Jd(self)
+        self.linkgrabber = Linkgrabber(self)
+        self.toolbar = Toolbar(self)
+        self.update = Update(self)
+
+    async def action(
+        self,
+        path: str,
+        params: list | tuple | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """Call an action on the JDownloader, directly if possible."""
+        if (
+            self.direct_api is not None
+            and time.monotonic() >= self._direct_api_retry_at
+        ):
+            try:
+                return await self.api.async_action(
+                    self.device_id,
+                    path,
+                    params,
+                    self.direct_api,
+                    timeout or DIRECT_CONNECTION_TIMEOUT_SECONDS,
+                )
+            except MYJDConnectionException:
+                _LOGGER.debug(
+                    "Direct connection to JDownloader (%s) failed, using %s",
+                    self.name,
+                    API_URL,
+                )
+                self._direct_api_retry_at = (
+                    time.monotonic() + DIRECT_CONNECTION_COOLDOWN_SECONDS
+                )
+        return await self.api.async_action(
+            self.device_id, path, params, timeout=timeout or API_TIMEOUT_SECONDS
+        )
+
+    async def get_direct_connection_infos(self) -> list[dict[str, Any]]:
+        """Return the local endpoints of the JDownloader, asked via the relay."""
+        data = await self.api.async_action(
+            self.device_id, "/device/getDirectConnectionInfos"
+        )
+        return (data or {}).get("infos") or []
+
+    async def async_probe_direct_api(self, api: str) -> bool:
+        """Return True if the JDownloader answers on a local endpoint."""
+        try:
+            await self.api.async_action(
+                self.device_id,
+                "/jd/getCoreRevision",
+                api=api,
+                timeout=DIRECT_CONNECTION_TIMEOUT_SECONDS,
+            )
+        except MYJDException:
+            return False
+        return True
+
+    def set_direct_api(self, api: str | None) -> None:
+        """Route calls to a local endpoint, or through the relay if None."""
+        self.direct_api = api
+        self._direct_api_retry_at = 0.0
+
+
+class _DeviceComponent:
+    """Base class of the functional areas of a JDownloader."""
+
+    url = ""
+
+    def __init__(self, device: MyJDownloaderDevice) -> None:
+        """Initialize the component."""
+        self.device = device
+
+    async def _action(
+        self, path: str, params: list | None = None, timeout: float | None = None
+    ) -> Any:
+        """Call an action of this component."""
+        return await self.device.action(self.url + path, params, timeout)
+
+
+class DownloadController(_DeviceComponent):
+    """The download controller of a JDownloader."""
+
+    url = "/downloadcontroller"
+
+    async def start_downloads(self) -> Any:
+        """Start downloads."""
+        return await self._action("/start")
+
+    async def stop_downloads(self) -> Any:
+        """Stop downloads."""
+        return await self._action("/stop")
+
+    async def pause_downloads(self, value: bool) -> Any:
+        """Pause or resume downloads."""
+        return await self._action("/pause", [value])
+
+    async def get_speed_in_bytes(self) -> int:
+        """Return the download speed in bytes per second."""
+        return await self._action("/getSpeedInBps")
+
+    async def get_current_state(self) -> str:
+        """Return the state of the download controller."""
+        return await self._action("/getCurrentState")
+
+
+class Downloads(_DeviceComponent):
+    """The download list of a JDownloader."""
+
+    url = "/downloadsV2"
+
+    async def query_links(
+        self, params: list[dict[str, Any]] | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the links in the download list."""
+        return await self._action("/queryLinks", params or [DOWNLOADS_LINKS_QUERY])
+
+    async def query_packages(
+        self, params: list[dict[str, Any]] | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the packages in the download list."""
+        return await self._action(
+            "/queryPackages", params or [DOWNLOADS_PACKAGES_QUERY]
+        )
+
+
+class Events(_DeviceComponent):
+    """The event publisher of a JDownloader."""
+
+    url = "/events"
+
+    async def subscribe(
+        self, subscriptions: list[str], exclusions: list[str]
+    ) -> dict[str, Any]:
+        """Subscribe to events matching the patterns."""
+        return await self._action("/subscribe", [subscriptions, exclusions])
+
+    async def set_subscription_timeouts(
+        self, subscription_id: int, poll_timeout: int, max_keepalive: int
+    ) -> dict[str, Any]:
+        """Set how long listen waits for events and a subscription stays alive."""
+        return await self._action(
+            "/setsubscriptiontimeouts", [subscription_id, poll_timeout, max_keepalive]
+        )
+
+    async def listen(self, subscription_id: int, timeout: float) -> list[dict]:
+        """Wait for the next events of a subscription."""
+        return await self._action("/listen", [subscription_id], timeout) or []
+
+    async def unsubscribe(self, subscription_id: int) -> dict[str, Any]:
+        """Drop a subscription."""
+        return await self._action("/unsubscribe", [subscription_id])
+
+
+class Jd(_DeviceComponent):
+    """General information about a JDownloader."""
+
+    url = "/jd"
+
+    async def get_core_revision(self) -> int:
+        """Return the core revision."""
+        return await self._action("/getCoreRevision")
+
+
+class Linkgrabber(_DeviceComponent):
+    """The link grabber of a JDownloader."""
+
+    url = "/linkgrabberv2"
+
+    async def add_links(self, params: list[dict[str, Any]]) -> dict[str, Any]:
+        """Add links to the link grabber."""
+        return await self._action("/addLinks", params)
+
+    async def query_links(
+        self, params: list[dict[str, Any]] | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the links in the link grabber."""
+        return await self._action("/queryLinks", params or [LINKGRABBER_LINKS_QUERY])
+
+
+class Toolbar(_DeviceComponent):
+    """The toolbar of a JDownloader."""
+
+    url = "/toolbar"
+
+    async def get_status(self) -> dict[str, Any]:
+        """Return the toolbar status."""
+        return await self._action("/getStatus")
+
+    async def status_downloadSpeedLimit(self) -> bool:
+        """Return True if the download speed limit is enabled."""
+        return bool((await self.get_status())["limit"])
+
+    async def enable_downloadSpeedLimit(self) -> None:
+        """Enable the download speed limit."""
+        if not await self.status_downloadSpeedLimit():
+            await self._action("/toggleDownloadSpeedLimit")
+
+    async def disable_downloadSpeedLimit(self) -> None:
+        """Disable the download speed limit."""
+        if await self.status_downloadSpeedLimit():
+            await self._action("/toggleDownloadSpeedLimit")
+
+
+class Update(_DeviceComponent):
+    """The updater of a JDownloader."""
+
+    url = "/update"
+
+    async def restart_and_update(self) -> Any:
+        """Restart and update JDownloader."""
+        return await self._action("/restartAndUpdate")
+
+    async def run_update_check(self) -> Any:
+        """Check for updates."""
+        return await self._action("/runUpdateCheck")
+
+    async def is_update_available(self) -> bool:
+        """Return True if an update is available."""
+        return await self._action("/isUpdateAvailable")
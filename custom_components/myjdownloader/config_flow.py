@@ -8,13 +8,34 @@ from typing import Any
 from myjdapi.myjdapi import MYJDException
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
 
 from . import MyJDownloaderHub
-from .const import DOMAIN, TITLE
+from .api import DOWNLOADS_LINKS_FIELDS, DOWNLOADS_PACKAGES_FIELDS
+from .const import (
+    ATTRIBUTE_ITEMS_MAX,
+    CONF_ATTRIBUTE_ITEMS,
+    CONF_DIRECT_CONNECTION,
+    CONF_LINK_FIELDS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_PACKAGE_FIELDS,
+    DEFAULT_ATTRIBUTE_ITEMS,
+    DEFAULT_DIRECT_CONNECTION,
+    DEFAULT_LINK_FIELDS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_PACKAGE_FIELDS,
+    DOMAIN,
+    TITLE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -69,6 +90,67 @@ class MyJDownloaderConfigFlowHandler(ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return MyJDownloaderOptionsFlowHandler(config_entry)
+
+
+class MyJDownloaderOptionsFlowHandler(OptionsFlow):
+    """Handle MyJDownloader options."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize MyJDownloader options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=options.get(
+                            CONF_MAX_CONCURRENT_REQUESTS,
+                            DEFAULT_MAX_CONCURRENT_REQUESTS,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Required(
+                        CONF_DIRECT_CONNECTION,
+                        default=options.get(
+                            CONF_DIRECT_CONNECTION, DEFAULT_DIRECT_CONNECTION
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_PACKAGE_FIELDS,
+                        default=options.get(
+                            CONF_PACKAGE_FIELDS, DEFAULT_PACKAGE_FIELDS
+                        ),
+                    ): cv.multi_select(DOWNLOADS_PACKAGES_FIELDS),
+                    vol.Required(
+                        CONF_LINK_FIELDS,
+                        default=options.get(CONF_LINK_FIELDS, DEFAULT_LINK_FIELDS),
+                    ): cv.multi_select(DOWNLOADS_LINKS_FIELDS),
+                    vol.Required(
+                        CONF_ATTRIBUTE_ITEMS,
+                        default=options.get(
+                            CONF_ATTRIBUTE_ITEMS, DEFAULT_ATTRIBUTE_ITEMS
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=ATTRIBUTE_ITEMS_MAX)
+                    ),
+                }
+            ),
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
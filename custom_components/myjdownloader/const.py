@@ -1,9 +1,58 @@
 """Constants for the MyJDownloader integration."""
 
+from enum import IntFlag
+
 DOMAIN = "myjdownloader"
 TITLE = "MyJDownloader"
 
 SCAN_INTERVAL_SECONDS = 60
+UPDATE_AVAILABLE_SCAN_INTERVAL_SECONDS = 15 * 60
+QUERY_CACHE_TTL_SECONDS = 5
+# device snapshots are polled fast while downloading, idle ones back off
+POLL_RUNNING_SECONDS = 10
+POLL_IDLE_MIN_SECONDS = 30
+POLL_IDLE_MAX_SECONDS = 10 * 60
+# commands mark the snapshot fields they change, which are fetched shortly after
+COMMAND_REFRESH_DELAY_SECONDS = 1
+# switches show their new state at once, snapshots have to confirm it in time
+SWITCH_CONFIRM_SECONDS = 15
+# fired on the event bus if the new state of a switch is rolled back
+EVENT_SWITCH_FAILED = f"{DOMAIN}_switch_failed"
+
+# devices and their last snapshot are cached, so entities come up before the
+# cloud responds
+STORAGE_VERSION = 1
+STORAGE_KEY = DOMAIN
+STORAGE_SAVE_DELAY_SECONDS = 60
+RECONNECT_RETRY_MIN_SECONDS = 30
+RECONNECT_RETRY_MAX_SECONDS = 10 * 60
+# the session is resumed across restarts and only renewed once it gets old
+SESSION_MAX_AGE_SECONDS = 30 * 60
+
+CONF_ATTRIBUTE_ITEMS = "attribute_items"
+CONF_DIRECT_CONNECTION = "direct_connection"
+CONF_LINK_FIELDS = "link_fields"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_PACKAGE_FIELDS = "package_fields"
+# links and packages listed in state attributes, the state holds the total
+DEFAULT_ATTRIBUTE_ITEMS = 20
+ATTRIBUTE_ITEMS_MAX = 100
+DEFAULT_DIRECT_CONNECTION = True
+# fields of links and packages queried for the sensors, uuid and name are implied
+DEFAULT_LINK_FIELDS = [
+    "bytesLoaded",
+    "bytesTotal",
+    "eta",
+    "finished",
+    "running",
+    "speed",
+    "status",
+]
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+DEFAULT_PACKAGE_FIELDS = DEFAULT_LINK_FIELDS
+# fields of links the URL index is fed from, the add links services skip links
+# already in the download list
+LINK_FIELDS_REQUIRED = ["url"]
 
 LATEST_VERSION_SCAN_INTERVAL_SECONDS = 24 * 3600  # disabled, if <= 0
 LATEST_VERSION_URL = "https://svn.jdownloader.org/build.php"
@@ -11,11 +60,86 @@ LATEST_VERSION_REGEX = (
     r".*LatestRevision:[^\d+]+(\d+)[^\d+]+Date:[^\d+]+<[^>]+>([^<]+).*"
 )
 
+SNAPSHOT_ACTIVE_PACKAGES = "active_packages"
+SNAPSHOT_BYTES_REMAINING = "bytes_remaining"
+SNAPSHOT_CORE_REVISION = "core_revision"
+SNAPSHOT_ETA = "eta"
+SNAPSHOT_HOST_SPEEDS = "host_speeds"
+SNAPSHOT_LIMIT = "limit"
+SNAPSHOT_PACKAGES = "packages"
+SNAPSHOT_PROGRESS = "progress"
+SNAPSHOT_SPEED = "speed"
+SNAPSHOT_STATE = "state"
+SNAPSHOT_UPDATE_AVAILABLE = "update_available"
+# fields of packages the derived snapshot values are computed from, queried
+# while an entity shows the value, whatever fields are configured
+SNAPSHOT_PACKAGE_FIELDS = {
+    SNAPSHOT_ACTIVE_PACKAGES: frozenset({"running"}),
+    SNAPSHOT_BYTES_REMAINING: frozenset({"bytesLoaded", "bytesTotal"}),
+    SNAPSHOT_ETA: frozenset({"bytesLoaded", "bytesTotal", "speed"}),
+    SNAPSHOT_HOST_SPEEDS: frozenset({"hosts", "speed"}),
+    SNAPSHOT_PROGRESS: frozenset({"bytesLoaded", "bytesTotal"}),
+}
+
 ATTR_LINKS = "links"
 ATTR_PACKAGES = "packages"
+ATTR_OMITTED = "omitted"
+ATTR_BYTES_LOADED = "bytes_loaded"
+ATTR_BYTES_TOTAL = "bytes_total"
+ATTR_FINISHED = "finished"
+ATTR_LARGEST = "largest"
+ATTR_RUNNING = "running"
+ATTR_SLOWEST = "slowest"
+# entries of the largest and slowest rankings in state attributes
+ATTR_RANKING_MAX = 5
 
 MYJDAPI_APP_KEY = "https://git.io/JO0Dh"
 
+API_URL = "https://api.jdownloader.org"
+API_VERSION = 1
+API_TIMEOUT_SECONDS = 10
+API_POOL_SIZE = 16
+API_KEEPALIVE_SECONDS = SCAN_INTERVAL_SECONDS + 15
+DECODE_IN_EXECUTOR_MIN_BYTES = 64 * 1024
+# upper bounds of the buckets of the API call histograms
+API_CALL_TIME_BUCKETS_SECONDS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+API_CALL_PAYLOAD_BUCKETS_BYTES = (1024, 8 * 1024, 64 * 1024, 512 * 1024, 4 * 1024**2)
+# failed queries are retried with jittered, doubling delays
+RETRY_ATTEMPTS = 2
+RETRY_BACKOFF_SECONDS = 1
+# after a few failures in a row, calls to a JDownloader fail fast and a single
+# call probes it once per backoff window
+CIRCUIT_BREAKER_THRESHOLD = 3
+CIRCUIT_BREAKER_RETRY_MIN_SECONDS = 30
+CIRCUIT_BREAKER_RETRY_MAX_SECONDS = 10 * 60
+# URLs submitted to or seen on a JDownloader are not submitted again for a while
+URL_INDEX_MAX_SIZE = 10_000
+URL_INDEX_TTL_SECONDS = 6 * 3600
+# links are queried in pages, so long download lists are never held at once
+LINKS_PAGE_SIZE = 500
+
+DIRECT_CONNECTION_TIMEOUT_SECONDS = 2
+DIRECT_CONNECTION_COOLDOWN_SECONDS = 60
+DIRECT_CONNECTION_REFRESH_SECONDS = 15 * 60
+
+# event stream of a JDownloader, polling is only a fallback while it works
+EVENT_PUBLISHER_DOWNLOADS = "downloads"
+EVENT_PUBLISHER_DOWNLOADWATCHDOG = "downloadwatchdog"
+EVENT_PUBLISHER_LINKGRABBER = "linkgrabberv2"
+EVENT_SUBSCRIPTIONS = [
+    f"{EVENT_PUBLISHER_DOWNLOADS}.*",
+    f"{EVENT_PUBLISHER_DOWNLOADWATCHDOG}.*",
+    f"{EVENT_PUBLISHER_LINKGRABBER}.*",
+]
+# progress events arrive several times per second while downloading
+EVENT_EXCLUSIONS = [r".*\.(bytesLoaded|eta|speed)$"]
+EVENT_POLL_TIMEOUT_SECONDS = 25
+EVENT_KEEPALIVE_SECONDS = 5 * 60
+EVENT_RETRY_MIN_SECONDS = 30
+EVENT_RETRY_MAX_SECONDS = 5 * 60
+EVENT_FALLBACK_SCAN_INTERVAL_SECONDS = 5 * 60
+EVENT_DEBOUNCE_SECONDS = 1
+
 DATA_MYJDOWNLOADER_CLIENT = "myjdownloader_client"
 
 SERVICE_RESTART_AND_UPDATE = "restart_and_update"
@@ -23,6 +147,10 @@ SERVICE_RUN_UPDATE_CHECK = "run_update_check"
 SERVICE_START_DOWNLOADS = "start_downloads"
 SERVICE_STOP_DOWNLOADS = "stop_downloads"
 SERVICE_ADD_LINKS = "add_links"
+SERVICE_ADD_LINKS_BATCH = "add_links_batch"
+SERVICE_QUERY_LINKGRABBER = "query_linkgrabber"
+SERVICE_QUERY_LINKS = "query_links"
+SERVICE_QUERY_PACKAGES = "query_packages"
 
 FIELD_LINKS = "links"
 FIELD_PRIORITY = "priority"
@@ -33,3 +161,22 @@ FIELD_EXTRACT_PASSWORD = "extract_password"
 FIELD_DOWNLOAD_PASSWORD = "download_password"
 FIELD_DESTINATION_FOLDER = "destination_folder"
 FIELD_OVERWRITE_PACKAGIZER_RULES = "overwrite_packagizer_rules"
+FIELD_PACKAGES = "packages"
+FIELD_FIELDS = "fields"
+FIELD_HOST = "host"
+FIELD_LIMIT = "limit"
+FIELD_NAME = "name"
+FIELD_STATUS = "status"
+
+# items returned by the query services, by default and at most
+QUERY_LIMIT_DEFAULT = 100
+QUERY_LIMIT_MAX = 1000
+# fields of LinkGrabber links returned by the query service, unless selected
+DEFAULT_LINKGRABBER_FIELDS = ["availability", "bytesTotal", "hosts", "status", "url"]
+
+
+class MyJDownloaderEntityFeature(IntFlag):
+    """Services answered by one entity of each JDownloader."""
+
+    # services that return a response must match a single entity
+    RESPONSE_SERVICES = 1
@@ -0,0 +1,306 @@
+"""Data update coordinator for MyJDownloader devices."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import datetime
+import logging
+from typing import TYPE_CHECKING, Any
+
+from myjdapi.myjdapi import MYJDException
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    COMMAND_REFRESH_DELAY_SECONDS,
+    DOMAIN,
+    EVENT_FALLBACK_SCAN_INTERVAL_SECONDS,
+    POLL_IDLE_MAX_SECONDS,
+    POLL_IDLE_MIN_SECONDS,
+    POLL_RUNNING_SECONDS,
+    SCAN_INTERVAL_SECONDS,
+    SNAPSHOT_ACTIVE_PACKAGES,
+    SNAPSHOT_BYTES_REMAINING,
+    SNAPSHOT_CORE_REVISION,
+    SNAPSHOT_ETA,
+    SNAPSHOT_HOST_SPEEDS,
+    SNAPSHOT_LIMIT,
+    SNAPSHOT_PACKAGE_FIELDS,
+    SNAPSHOT_PACKAGES,
+    SNAPSHOT_PROGRESS,
+    SNAPSHOT_SPEED,
+    SNAPSHOT_STATE,
+    SNAPSHOT_UPDATE_AVAILABLE,
+    UPDATE_AVAILABLE_SCAN_INTERVAL_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from . import MyJDownloaderHub
+    from .api import MyJDownloaderDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+# snapshot fields by the API calls that fetch them
+SNAPSHOT_GROUP_STATUS = "status"
+SNAPSHOT_GROUP_STATE = "state"
+SNAPSHOT_GROUP_UPDATE = "update"
+SNAPSHOT_GROUP_PACKAGES = "packages"
+SNAPSHOT_GROUPS: dict[str, frozenset[str]] = {
+    SNAPSHOT_GROUP_STATUS: frozenset({SNAPSHOT_LIMIT, SNAPSHOT_SPEED}),
+    SNAPSHOT_GROUP_STATE: frozenset({SNAPSHOT_STATE}),
+    SNAPSHOT_GROUP_UPDATE: frozenset(
+        {SNAPSHOT_CORE_REVISION, SNAPSHOT_UPDATE_AVAILABLE}
+    ),
+    SNAPSHOT_GROUP_PACKAGES: frozenset(
+        {
+            SNAPSHOT_ACTIVE_PACKAGES,
+            SNAPSHOT_BYTES_REMAINING,
+            SNAPSHOT_ETA,
+            SNAPSHOT_HOST_SPEEDS,
+            SNAPSHOT_PACKAGES,
+            SNAPSHOT_PROGRESS,
+        }
+    ),
+}
+
+
+class MyJDownloaderDeviceCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Fetch a snapshot of a JDownloader once per cycle for all of its entities."""
+
+    def __init__(
+        self, hass: HomeAssistant, hub: MyJDownloaderHub, device_id: str
+    ) -> None:
+        """Initialize the MyJDownloader device coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{device_id}",
+            update_interval=datetime.timedelta(seconds=SCAN_INTERVAL_SECONDS),
+        )
+        self.hub = hub
+        self.device_id = device_id
+        self._update_checked_at = datetime.datetime.fromtimestamp(0, tz=datetime.UTC)
+        self._events_connected = False
+        self._idle_seconds = POLL_IDLE_MIN_SECONDS
+        self._dirty_groups: set[str] = set()
+        # package fields of the last query, None before the first one
+        self._package_fields: frozenset[str] | None = None
+        self._dirty_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=COMMAND_REFRESH_DELAY_SECONDS,
+            immediate=False,
+            function=self._async_refresh_dirty,
+        )
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch the latest snapshot of the JDownloader."""
+        data = await self._async_fetch(SNAPSHOT_GROUPS)
+        if data.get(SNAPSHOT_STATE) == "RUNNING":
+            self._idle_seconds = POLL_IDLE_MIN_SECONDS
+        else:
+            self._idle_seconds = min(self._idle_seconds * 2, POLL_IDLE_MAX_SECONDS)
+        return data
+
+    async def _async_fetch(self, groups: Iterable[str]) -> dict[str, Any]:
+        """Fetch some groups of snapshot fields, keeping the others."""
+        if self.device_id not in self.hub.devices:
+            raise UpdateFailed(f"JDownloader ({self.device_id}) offline")
+
+        device = self.hub.get_device(self.device_id)
+        data = dict(self.data or {})
+        fetchers = {
+            SNAPSHOT_GROUP_STATUS: self._async_fetch_status,
+            SNAPSHOT_GROUP_STATE: self._async_fetch_state,
+            SNAPSHOT_GROUP_UPDATE: self._async_fetch_update,
+            SNAPSHOT_GROUP_PACKAGES: self._async_fetch_packages,
+        }
+        try:
+            for group in groups:
+                await fetchers[group](device, data)
+        except MYJDException as ex:
+            raise UpdateFailed(
+                f"Error communicating with JDownloader ({self.device_id})"
+            ) from ex
+
+        self._set_update_interval(data)
+        self.hub.async_schedule_cache_save()
+        return data
+
+    async def _async_fetch_status(
+        self, device: MyJDownloaderDevice, data: dict[str, Any]
+    ) -> None:
+        """Fetch the speed limit flag and the download speed."""
+        # the toolbar status carries the speed limit flag and, on recent
+        # JDownloader versions, the current download speed
+        status = await self.hub.async_query(device.toolbar.get_status)
+        data[SNAPSHOT_LIMIT] = bool(status.get("limit"))
+        speed = status.get("speed")
+        if speed is None:
+            speed = await self.hub.async_query(
+                device.downloadcontroller.get_speed_in_bytes
+            )
+        data[SNAPSHOT_SPEED] = speed
+
+    async def _async_fetch_state(
+        self, device: MyJDownloaderDevice, data: dict[str, Any]
+    ) -> None:
+        """Fetch the state of the download controller."""
+        data[SNAPSHOT_STATE] = await self.hub.async_query(
+            device.downloadcontroller.get_current_state
+        )
+
+    async def _async_fetch_update(
+        self, device: MyJDownloaderDevice, data: dict[str, Any]
+    ) -> None:
+        """Fetch update availability and the core revision."""
+        # update availability changes rarely, do not ask for it every cycle
+        now = datetime.datetime.now(datetime.UTC)
+        if (
+            SNAPSHOT_UPDATE_AVAILABLE in data
+            and (now - self._update_checked_at).total_seconds()
+            <= UPDATE_AVAILABLE_SCAN_INTERVAL_SECONDS
+        ):
+            return
+        update_available = await self.hub.async_query(device.update.is_update_available)
+        if (
+            data.get(SNAPSHOT_CORE_REVISION) is None
+            or data.get(SNAPSHOT_UPDATE_AVAILABLE) != update_available
+        ):
+            data[SNAPSHOT_CORE_REVISION] = await self.hub.async_query(
+                device.jd.get_core_revision
+            )
+        data[SNAPSHOT_UPDATE_AVAILABLE] = update_available
+        self._update_checked_at = now
+
+    async def _async_fetch_packages(
+        self, device: MyJDownloaderDevice, data: dict[str, Any]
+    ) -> None:
+        """Fetch the packages and derive the download progress from them."""
+        # packages feed the packages sensor and the derived sensors
+        fields = self._needed_package_fields()
+        items = await self.hub.async_query(
+            device.downloads.query_packages,
+            self.hub.build_packages_query(fields=fields),
+        )
+        self._package_fields = fields
+        store = self.hub.stores[self.device_id]
+        store.packages.start()
+        store.packages.add(items or [])
+        if delta := store.packages.finish():
+            async_dispatcher_send(
+                self.hass, f"{DOMAIN}_packages_changed_{self.device_id}", delta
+            )
+        data.update(store.package_summary())
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, fetch package fields a new entity needs."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        if self._package_fields is not None and not self._package_fields.issuperset(
+            self._needed_package_fields()
+        ):
+            self.async_mark_dirty(SNAPSHOT_GROUPS[SNAPSHOT_GROUP_PACKAGES])
+        return remove_listener
+
+    def _needed_package_fields(self) -> frozenset[str]:
+        """Return the package fields of the derived values entities show.
+
+        Until entities listen, e.g. for the first snapshot, all are needed.
+        """
+        contexts = [context for _, context in self._listeners.values()]
+        keys = set(SNAPSHOT_PACKAGE_FIELDS)
+        if contexts and None not in contexts:
+            keys.intersection_update(set().union(*contexts))
+        return frozenset().union(*(SNAPSHOT_PACKAGE_FIELDS[key] for key in keys))
+
+    @callback
+    def async_mark_dirty(self, keys: Iterable[str]) -> None:
+        """Refresh some snapshot fields soon, after a command changed them.
+
+        Fields marked by several commands in a row are fetched once and only
+        the entities that depend on them are updated.
+        """
+        if self.data is None:
+            return
+        for group, group_keys in SNAPSHOT_GROUPS.items():
+            if not group_keys.isdisjoint(keys):
+                self._dirty_groups.add(group)
+        if self._dirty_groups:
+            self.hass.async_create_task(self._dirty_debouncer.async_call())
+
+    async def _async_refresh_dirty(self) -> None:
+        """Fetch the dirty snapshot fields and notify their entities."""
+        groups, self._dirty_groups = self._dirty_groups, set()
+        if not groups:
+            return
+        if SNAPSHOT_GROUP_UPDATE in groups:
+            self.request_update_check()
+        try:
+            # fetch in the order of a full refresh
+            data = await self._async_fetch(
+                [group for group in SNAPSHOT_GROUPS if group in groups]
+            )
+        except UpdateFailed as ex:
+            _LOGGER.debug("Failed to refresh %s: %s", groups, ex)
+            # a full refresh reports the failure to all entities
+            await self.async_request_refresh()
+            return
+
+        self.data = data
+        # the state may have changed, e.g. downloads started on an idle device
+        self._reschedule_refresh()
+        keys = set().union(*(SNAPSHOT_GROUPS[group] for group in groups))
+        for update_callback, context in list(self._listeners.values()):
+            # listeners without context depend on all fields
+            if context is None or not keys.isdisjoint(context):
+                update_callback()
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending refreshes."""
+        await super().async_shutdown()
+        self._dirty_debouncer.async_cancel()
+
+    def _set_update_interval(self, data: dict[str, Any]) -> None:
+        """Poll fast while downloading and back off while idle.
+
+        While events arrive, they report state changes, so an idle JDownloader
+        is only polled as a fallback.
+        """
+        if data.get(SNAPSHOT_STATE) == "RUNNING":
+            seconds = POLL_RUNNING_SECONDS
+        elif self._events_connected:
+            seconds = max(self._idle_seconds, EVENT_FALLBACK_SCAN_INTERVAL_SECONDS)
+        else:
+            seconds = self._idle_seconds
+        self.update_interval = datetime.timedelta(seconds=seconds)
+
+    def set_events_connected(self, connected: bool) -> None:
+        """Remember whether events of the JDownloader arrive."""
+        self._events_connected = connected
+        self._set_update_interval(self.data or {})
+
+    def reset_update_interval(self) -> None:
+        """Poll fast again after a call changed the state of the JDownloader."""
+        self._idle_seconds = POLL_IDLE_MIN_SECONDS
+        self._set_update_interval(self.data or {})
+        self._reschedule_refresh()
+
+    @callback
+    def _reschedule_refresh(self) -> None:
+        """Restart the refresh timer, so a shorter update interval applies now.
+
+        The timer is only rescheduled by refreshes, a backed off one would
+        fire at the old interval otherwise.
+        """
+        if self._listeners:
+            self._schedule_refresh()
+
+    def request_update_check(self) -> None:
+        """Query update availability again on the next refresh."""
+        self._update_checked_at = datetime.datetime.fromtimestamp(0, tz=datetime.UTC)
@@ -0,0 +1,41 @@
+"""Diagnostics support for the MyJDownloader integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from . import MyJDownloaderHub
+from .const import DATA_MYJDOWNLOADER_CLIENT, DOMAIN
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    hub: MyJDownloaderHub = hass.data[DOMAIN][entry.entry_id][DATA_MYJDOWNLOADER_CLIENT]
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "devices": {
+            device_id: {
+                "name": device.name,
+                "type": device.device_type,
+                "events_connected": hub.events_connected(device_id),
+            }
+            for device_id, device in hub.devices.items()
+        },
+        "api_calls": hub.api_call_stats,
+        "circuit_breakers": hub.circuit_breaker_stats,
+        "connections": hub.connection_stats,
+        "queues": hub.queue_stats,
+        "url_index": hub.url_index_stats,
+    }
@@ -2,17 +2,36 @@
 
 from __future__ import annotations
 
+from fnmatch import fnmatchcase
 import logging
 from string import Template
+import time
+from typing import Any
 
 from myjdapi.exception import MYJDConnectionException, MYJDException
 
 from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import Entity
 
 from . import MyJDownloaderHub
-from .const import DOMAIN
+from .api import (
+    DOWNLOADS_LINKS_QUERY,
+    DOWNLOADS_PACKAGES_QUERY,
+    LINKGRABBER_LINKS_QUERY,
+    build_query,
+)
+from .const import (
+    DEFAULT_LINKGRABBER_FIELDS,
+    DOMAIN,
+    EVENT_DEBOUNCE_SECONDS,
+    EVENT_FALLBACK_SCAN_INTERVAL_SECONDS,
+    QUERY_LIMIT_DEFAULT,
+)
+from .coordinator import MyJDownloaderDeviceCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -135,6 +154,7 @@ class MyJDownloaderDeviceEntity(MyJDownloaderEntity):
         """Service call to run update check of JDownloader."""
         device = self.hub.get_device(self._device_id)
         await self.hub.async_query(device.update.run_update_check)
+        self.hub.coordinators[self._device_id].request_update_check()
 
     async def start_downloads(self):
         """Service call to start downloads."""
@@ -158,24 +178,391 @@ class MyJDownloaderDeviceEntity(MyJDownloaderEntity):
         overwrite_packagizer_rules: bool = False,
         package_name: str | None = None,
     ):
-        """Service call to add links."""
-        # https://my.jdownloader.org/developers/index.html#tag_244
+        """Service call to add links, skipping ones submitted recently."""
+        device = self.hub.get_device(self._device_id)
+        urls = self.hub.stores[self._device_id].urls
+        skipped = len(links)
+        links = urls.filter(links)
+        skipped -= len(links)
+        if skipped:
+            _LOGGER.debug(
+                "Skipped %s links already submitted to JDownloader (%s)",
+                skipped,
+                self._device_name,
+            )
+        if not links:
+            return
+
         params = [
-            {
-                # assignJobID
-                "autoExtract": auto_extract,
-                "autostart": autostart,
-                # dataURLs
-                # deepDecrypt
-                "destinationFolder": destination_folder,
-                "downloadPassword": download_password,
-                "extractPassword": extract_password,
-                "links": str(links),
-                "overwritePackagizerRules": overwrite_packagizer_rules,
-                "packageName": package_name,
-                "priority": priority.upper(),
-                # sourceUrl
-            }
+            _link_collecting_job(
+                links,
+                priority,
+                auto_extract,
+                autostart,
+                destination_folder,
+                download_password,
+                extract_password,
+                overwrite_packagizer_rules,
+                package_name,
+            )
         ]
+        try:
+            await self.hub.async_query(device.linkgrabber.add_links, params)
+        except MYJDException:
+            urls.discard(links)
+            raise
+
+    async def add_links_batch(self, packages: list[dict[str, Any]]) -> dict[str, Any]:
+        """Service call to add the links of many packages with few requests.
+
+        Packages with the same options share a request. Links already in the
+        LinkGrabber, submitted recently or listed twice are skipped.
+        """
+        device = self.hub.get_device(self._device_id)
+        urls = self.hub.stores[self._device_id].urls
+        urls.add(
+            link["url"]
+            for link in await self.hub.async_query(
+                device.linkgrabber.query_links,
+                [build_query(LINKGRABBER_LINKS_QUERY, ["url"])],
+            )
+            or []
+            if link.get("url")
+        )
+
+        # group packages by their options, keep the order of first appearance
+        groups: dict[tuple, list[int]] = {}
+        links: list[list[str]] = []
+        skipped: list[int] = []
+        for index, package in enumerate(packages):
+            options = {key: value for key, value in package.items() if key != "links"}
+            groups.setdefault(tuple(sorted(options.items())), []).append(index)
+            links.append(urls.filter(package["links"]))
+            skipped.append(len(package["links"]) - len(links[index]))
+
+        job_ids: list[int | None] = [None] * len(packages)
+        group_items = list(groups.items())
+        for position, (options, indexes) in enumerate(group_items):
+            group_links = [link for index in indexes for link in links[index]]
+            if not group_links:
+                continue
+            try:
+                response = await self.hub.async_query(
+                    device.linkgrabber.add_links,
+                    [_link_collecting_job(group_links, **dict(options))],
+                )
+            except MYJDException:
+                # neither this group nor the following ones were added
+                urls.discard(
+                    link
+                    for _, unsent in group_items[position:]
+                    for index in unsent
+                    for link in links[index]
+                )
+                raise
+            for index in indexes:
+                job_ids[index] = (response or {}).get("id")
+
+        return {
+            "packages": [
+                {
+                    "package_name": package.get("package_name"),
+                    "job_id": job_ids[index],
+                    "links": len(links[index]),
+                    "skipped": skipped[index],
+                }
+                for index, package in enumerate(packages)
+            ]
+        }
+
+    async def query_packages(
+        self,
+        fields: list[str] | None = None,
+        status: str | None = None,
+        host: str | None = None,
+        name: str | None = None,
+        limit: int = QUERY_LIMIT_DEFAULT,
+    ) -> dict[str, Any]:
+        """Service call to return the packages of the download list."""
         device = self.hub.get_device(self._device_id)
-        await self.hub.async_query(device.linkgrabber.add_links, params)
+        return await self._async_query_items(
+            device.downloads.query_packages,
+            DOWNLOADS_PACKAGES_QUERY,
+            "packages",
+            fields or self.hub.package_fields,
+            status,
+            host,
+            name,
+            limit,
+        )
+
+    async def query_links(
+        self,
+        fields: list[str] | None = None,
+        status: str | None = None,
+        host: str | None = None,
+        name: str | None = None,
+        limit: int = QUERY_LIMIT_DEFAULT,
+    ) -> dict[str, Any]:
+        """Service call to return the links of the download list."""
+        device = self.hub.get_device(self._device_id)
+        return await self._async_query_items(
+            device.downloads.query_links,
+            DOWNLOADS_LINKS_QUERY,
+            "links",
+            fields or self.hub.link_fields,
+            status,
+            host,
+            name,
+            limit,
+        )
+
+    async def query_linkgrabber(
+        self,
+        fields: list[str] | None = None,
+        status: str | None = None,
+        host: str | None = None,
+        name: str | None = None,
+        limit: int = QUERY_LIMIT_DEFAULT,
+    ) -> dict[str, Any]:
+        """Service call to return the links of the LinkGrabber."""
+        device = self.hub.get_device(self._device_id)
+        return await self._async_query_items(
+            device.linkgrabber.query_links,
+            LINKGRABBER_LINKS_QUERY,
+            "links",
+            fields or DEFAULT_LINKGRABBER_FIELDS,
+            status,
+            host,
+            name,
+            limit,
+        )
+
+    async def _async_query_items(
+        self,
+        func,
+        query: dict[str, Any],
+        key: str,
+        fields: list[str],
+        status: str | None,
+        host: str | None,
+        name: str | None,
+        limit: int,
+    ) -> dict[str, Any]:
+        """Return the first items matching the filters.
+
+        Responses are cached for a few seconds by the hub, so repeated calls do
+        not reach the JDownloader.
+        """
+        return await self.hub.async_cached_response(
+            self._device_id,
+            (func.__qualname__, tuple(sorted(fields)), status, host, name, limit),
+            self._async_collect_items,
+            func,
+            query,
+            key,
+            fields,
+            status,
+            host,
+            name,
+            limit,
+        )
+
+    async def _async_collect_items(
+        self,
+        func,
+        query: dict[str, Any],
+        key: str,
+        fields: list[str],
+        status: str | None,
+        host: str | None,
+        name: str | None,
+        limit: int,
+    ) -> dict[str, Any]:
+        """Query items page by page and collect the first ones matching the filters."""
+        host_field = "host" if "host" in query else "hosts"
+        queried = {*fields}
+        if status is not None:
+            queried.add("status")
+        if host is not None:
+            queried.add(host_field)
+        returned = {"uuid", "name", "packageUUID", *fields}
+
+        items: list[dict[str, Any]] = []
+        truncated = False
+        async for page in self.hub.async_iter_pages(func, build_query(query, queried)):
+            for item in page:
+                if not _item_matches(item, status, host_field, host, name):
+                    continue
+                if len(items) >= limit:
+                    truncated = True
+                    break
+                items.append(
+                    {field: value for field, value in item.items() if field in returned}
+                )
+            if truncated:
+                break
+        return {key: items, "truncated": truncated}
+
+
+def _item_matches(
+    item: dict[str, Any],
+    status: str | None,
+    host_field: str,
+    host: str | None,
+    name: str | None,
+) -> bool:
+    """Return True if a link or package matches the filters of a query service."""
+    if status is not None and status.lower() not in (item.get("status") or "").lower():
+        return False
+    if host is not None:
+        hosts = item.get(host_field) or []
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        if not any(host.lower() in value.lower() for value in hosts):
+            return False
+    if name is not None and not fnmatchcase(
+        (item.get("name") or "").lower(), name.lower()
+    ):
+        return False
+    return True
+
+
+def _link_collecting_job(
+    links: list[str],
+    priority: str = "default",
+    auto_extract: bool = False,
+    autostart: bool = False,
+    destination_folder: str | None = None,
+    download_password: str | None = None,
+    extract_password: str | None = None,
+    overwrite_packagizer_rules: bool = False,
+    package_name: str | None = None,
+) -> dict[str, Any]:
+    """Return the parameters of LinkGrabber addLinks."""
+    # https://my.jdownloader.org/developers/index.html#tag_244
+    return {
+        # assignJobID
+        "autoExtract": auto_extract,
+        "autostart": autostart,
+        # dataURLs
+        # deepDecrypt
+        "destinationFolder": destination_folder,
+        "downloadPassword": download_password,
+        "extractPassword": extract_password,
+        "links": "\n".join(links),
+        "overwritePackagizerRules": overwrite_packagizer_rules,
+        "packageName": package_name,
+        "priority": priority.upper(),
+        # sourceUrl
+    }
+
+
+class MyJDownloaderCoordinatorEntity(MyJDownloaderDeviceEntity):
+    """Defines a MyJDownloader device entity fed by the device coordinator."""
+
+    _attr_should_poll = False
+    # snapshot fields the entity shows, None for all
+    _snapshot_keys: frozenset[str] | None = None
+
+    @property
+    def coordinator(self) -> MyJDownloaderDeviceCoordinator:
+        """Return the coordinator of the JDownloader."""
+        return self.hub.coordinators[self._device_id]
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return (
+            self._device_id in self.hub.devices and self.coordinator.last_update_success
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_listener(
+                self._handle_coordinator_update, self._snapshot_keys
+            )
+        )
+        if self.coordinator.data is not None:
+            self._myjdownloader_handle_snapshot(self.coordinator.data)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if self.coordinator.data is not None:
+            self._myjdownloader_handle_snapshot(self.coordinator.data)
+        self.async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Request a refresh of the device snapshot."""
+        await self.coordinator.async_request_refresh()
+
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        raise NotImplementedError
+
+
+class MyJDownloaderEventEntity(MyJDownloaderDeviceEntity):
+    """Defines a MyJDownloader device entity refreshed on device events.
+
+    While the event stream of the JDownloader works, polling only refreshes
+    the entity every few minutes as a fallback.
+    """
+
+    # publishers of the events, that change the state of the entity
+    _event_publishers: tuple[str, ...] = ()
+    _updated_at = 0.0
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to events of the JDownloader."""
+        await super().async_added_to_hass()
+        debouncer = Debouncer(
+            self.hass,
+            _LOGGER,
+            cooldown=EVENT_DEBOUNCE_SECONDS,
+            immediate=False,
+            function=self._async_update_from_events,
+        )
+        self.async_on_remove(debouncer.async_cancel)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{DOMAIN}_events_{self._device_id}",
+                lambda events: self._handle_events(events, debouncer),
+            )
+        )
+
+    @callback
+    def _handle_events(self, events: list[dict], debouncer: Debouncer) -> None:
+        """Schedule an update, if an event concerns the entity."""
+        events = [
+            event
+            for event in events
+            if event.get("publisher") in self._event_publishers
+        ]
+        if events:
+            self._myjdownloader_handle_events(events)
+            self.hass.async_create_task(debouncer.async_call())
+
+    @callback
+    def _myjdownloader_handle_events(self, events: list[dict]) -> None:
+        """Take note of events before the entity is updated."""
+
+    async def _async_update_from_events(self) -> None:
+        """Update the entity after events."""
+        self._updated_at = 0.0
+        await self.async_update_ha_state(True)
+
+    async def async_update(self) -> None:
+        """Update MyJDownloader entity, unless events keep it up to date."""
+        if (
+            self.hub.events_connected(self._device_id)
+            and time.monotonic() - self._updated_at
+            < EVENT_FALLBACK_SCAN_INTERVAL_SECONDS
+        ):
+            return
+        await super().async_update()
+        self._updated_at = time.monotonic()
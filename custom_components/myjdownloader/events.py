@@ -0,0 +1,110 @@
+"""Event stream of MyJDownloader devices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from myjdapi.exception import MYJDDecodeException, MYJDException
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN,
+    EVENT_EXCLUSIONS,
+    EVENT_KEEPALIVE_SECONDS,
+    EVENT_POLL_TIMEOUT_SECONDS,
+    EVENT_RETRY_MAX_SECONDS,
+    EVENT_RETRY_MIN_SECONDS,
+    EVENT_SUBSCRIPTIONS,
+)
+
+if TYPE_CHECKING:
+    from . import MyJDownloaderHub
+    from .api import MyJDownloaderDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MyJDownloaderEventListener:
+    """Long-poll the event stream of a JDownloader and hand events to the hub."""
+
+    def __init__(
+        self, hass: HomeAssistant, hub: MyJDownloaderHub, device: MyJDownloaderDevice
+    ) -> None:
+        """Initialize the event listener."""
+        self._hass = hass
+        self._hub = hub
+        self._device = device
+        self._subscription_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self.connected = False
+
+    def start(self) -> None:
+        """Start listening in the background."""
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), f"{DOMAIN}_events_{self._device.device_id}"
+            )
+
+    async def async_stop(self) -> None:
+        """Stop listening and drop the subscription."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._set_connected(False)
+        if self._subscription_id is not None:
+            subscription_id, self._subscription_id = self._subscription_id, None
+            try:
+                await self._device.events.unsubscribe(subscription_id)
+            except MYJDException:
+                pass
+
+    async def _async_subscribe(self) -> None:
+        """Subscribe to the events of the JDownloader."""
+        response = await self._device.events.subscribe(
+            EVENT_SUBSCRIPTIONS, EVENT_EXCLUSIONS
+        )
+        if not response or "subscriptionid" not in response:
+            raise MYJDDecodeException(f"Failed to subscribe to events: {response}")
+        self._subscription_id = response["subscriptionid"]
+        await self._device.events.set_subscription_timeouts(
+            self._subscription_id,
+            EVENT_POLL_TIMEOUT_SECONDS * 1000,
+            EVENT_KEEPALIVE_SECONDS * 1000,
+        )
+
+    async def _async_run(self) -> None:
+        """Listen for events until stopped."""
+        retry_in = EVENT_RETRY_MIN_SECONDS
+        while True:
+            try:
+                if self._subscription_id is None:
+                    await self._async_subscribe()
+                events = await self._device.events.listen(
+                    self._subscription_id, EVENT_POLL_TIMEOUT_SECONDS + 10
+                )
+            except MYJDException:
+                _LOGGER.debug(
+                    "Event stream of JDownloader (%s) interrupted, retrying in %s s",
+                    self._device.name,
+                    retry_in,
+                    exc_info=True,
+                )
+                self._subscription_id = None
+                self._set_connected(False)
+                await asyncio.sleep(retry_in)
+                retry_in = min(retry_in * 2, EVENT_RETRY_MAX_SECONDS)
+                continue
+
+            retry_in = EVENT_RETRY_MIN_SECONDS
+            self._set_connected(True)
+            if events:
+                self._hub.async_handle_events(self._device.device_id, events)
+
+    def _set_connected(self, connected: bool) -> None:
+        """Tell the hub whether events arrive."""
+        if self.connected != connected:
+            self.connected = connected
+            self._hub.async_event_stream_changed(self._device.device_id)
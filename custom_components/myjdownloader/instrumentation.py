@@ -0,0 +1,137 @@
+"""Instrumentation of MyJDownloader API calls."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from typing import Any
+
+from .const import API_CALL_PAYLOAD_BUCKETS_BYTES, API_CALL_TIME_BUCKETS_SECONDS
+
+
+class Histogram:
+    """Observed values counted per bucket, with their sum and maximum."""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        """Initialize the histogram with the upper bounds of its buckets."""
+        self._bounds = tuple(bounds)
+        # the last bucket takes values above all bounds
+        self.counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Count a value in the first bucket whose bound is not below it."""
+        self.counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram, the buckets keyed by their upper bound."""
+        buckets = {str(bound): count for bound, count in zip(self._bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0,
+            "max": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+class CallStats:
+    """Calls of one API method, or of all methods of a JDownloader."""
+
+    def __init__(self) -> None:
+        """Initialize the call stats."""
+        self.calls = 0
+        # calls a circuit breaker failed without sending them
+        self.rejected = 0
+        self.errors: Counter[str] = Counter()
+        self.wait = Histogram(API_CALL_TIME_BUCKETS_SECONDS)
+        self.run = Histogram(API_CALL_TIME_BUCKETS_SECONDS)
+        self.payload = Histogram(API_CALL_PAYLOAD_BUCKETS_BYTES)
+
+    def record(
+        self,
+        wait: float,
+        run: float,
+        payload: int,
+        exception: BaseException | None,
+    ) -> None:
+        """Record a call."""
+        self.calls += 1
+        self.wait.observe(wait)
+        self.run.observe(run)
+        if payload:
+            self.payload.observe(payload)
+        if exception is not None:
+            self.errors[type(exception).__name__] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats, times in seconds and payloads in bytes."""
+        return {
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "errors": dict(self.errors),
+            "wait": self.wait.as_dict(),
+            "run": self.run.as_dict(),
+            "payload": self.payload.as_dict(),
+        }
+
+
+class MyJDownloaderInstrumentation:
+    """Stats of the API calls per JDownloader (None for the account) and method.
+
+    Each attempt of a call is recorded: the time it waited for its lane, the
+    time it ran, the bytes received and the class of the exception it
+    raised, if any.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the instrumentation."""
+        self._devices: defaultdict[str | None, CallStats] = defaultdict(CallStats)
+        self._methods: defaultdict[str | None, defaultdict[str, CallStats]] = (
+            defaultdict(lambda: defaultdict(CallStats))
+        )
+
+    def record(
+        self,
+        device_id: str | None,
+        method: str,
+        wait: float,
+        run: float,
+        payload: int,
+        exception: BaseException | None = None,
+    ) -> None:
+        """Record a call that was sent."""
+        self._devices[device_id].record(wait, run, payload, exception)
+        self._methods[device_id][method].record(wait, run, payload, exception)
+
+    def record_rejected(self, device_id: str | None, method: str) -> None:
+        """Record a call rejected by a circuit breaker."""
+        self._devices[device_id].rejected += 1
+        self._methods[device_id][method].rejected += 1
+
+    def device_stats(self, device_id: str | None) -> CallStats:
+        """Return the stats of all calls of a JDownloader."""
+        return self._devices.get(device_id) or CallStats()
+
+    def method_stats(self, device_id: str | None) -> dict[str, CallStats]:
+        """Return the stats of the calls of a JDownloader per method."""
+        return dict(self._methods.get(device_id) or {})
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the stats per JDownloader, the account under "account"."""
+        return {
+            device_id or "account": {
+                "total": stats.as_dict(),
+                "methods": {
+                    method: method_stats.as_dict()
+                    for method, method_stats in sorted(self._methods[device_id].items())
+                },
+            }
+            for device_id, stats in self._devices.items()
+        }
@@ -0,0 +1,268 @@
+"""Scheduling of MyJDownloader API calls."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import random
+import time
+from typing import Any
+
+# states of a circuit breaker
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_BULK: "bulk",
+}
+
+
+class _PrioritySemaphore:
+    """A semaphore that wakes waiters by priority, then in arrival order."""
+
+    def __init__(self, value: int) -> None:
+        """Initialize the semaphore."""
+        self._value = value
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    def locked(self) -> bool:
+        """Return True if acquire would wait."""
+        return self._value == 0 or any(
+            not waiter.done() for _, _, waiter in self._waiters
+        )
+
+    async def acquire(self, priority: int) -> None:
+        """Wait for a free slot."""
+        if not self.locked():
+            self._value -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over already, pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter or free it."""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._value += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Hold a slot while in the context."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class QueueStats:
+    """Queue wait times of API calls of one priority."""
+
+    def __init__(self) -> None:
+        """Initialize the queue stats."""
+        self.calls = 0
+        self.waiting = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats, wait times in seconds."""
+        return {
+            "calls": self.calls,
+            "waiting": self.waiting,
+            "wait_avg": round(self.wait_total / self.calls, 3) if self.calls else 0,
+            "wait_max": round(self.wait_max, 3),
+        }
+
+
+class MyJDownloaderScheduler:
+    """Run API calls on one lane per JDownloader and one for the account.
+
+    Calls on the same lane are sequential, calls on different lanes run in
+    parallel up to a global concurrency cap. Waiting calls are served by
+    priority: interactive commands before background refreshes before bulk
+    queries. Calls that replace the session (connect, reconnect, disconnect)
+    are exclusive: they wait until no other call is running and block new
+    ones until they are done.
+    """
+
+    def __init__(self, max_concurrent_requests: int) -> None:
+        """Initialize the MyJDownloader scheduler."""
+        self._lanes: dict[str | None, _PrioritySemaphore] = defaultdict(
+            lambda: _PrioritySemaphore(1)
+        )
+        self._concurrency = _PrioritySemaphore(max_concurrent_requests)
+        self._session_lock = asyncio.Lock()
+        self._running = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._stats = {priority: QueueStats() for priority in PRIORITY_NAMES}
+
+    @asynccontextmanager
+    async def lane(
+        self,
+        device_id: str | None,
+        exclusive: bool = False,
+        priority: int = PRIORITY_BACKGROUND,
+    ) -> AsyncIterator[float]:
+        """Wait for a free slot on the lane of a JDownloader (None for the account).
+
+        The context yields the time waited in seconds.
+        """
+        stats = self._stats[priority]
+        stats.waiting += 1
+        queued_at = time.monotonic()
+        waiting = True
+
+        def started() -> float:
+            nonlocal waiting
+            waiting = False
+            wait = time.monotonic() - queued_at
+            stats.waiting -= 1
+            stats.calls += 1
+            stats.wait_total += wait
+            stats.wait_max = max(stats.wait_max, wait)
+            return wait
+
+        try:
+            async with self._lanes[device_id].slot(priority):
+                if exclusive:
+                    async with self._session_lock:
+                        await self._idle.wait()
+                        async with self._concurrency.slot(priority):
+                            yield started()
+                    return
+
+                # wait for a running session change to finish
+                async with self._session_lock:
+                    pass
+                self._running += 1
+                self._idle.clear()
+                try:
+                    async with self._concurrency.slot(priority):
+                        yield started()
+                finally:
+                    self._running -= 1
+                    if not self._running:
+                        self._idle.set()
+        finally:
+            if waiting:
+                stats.waiting -= 1
+
+    def remove_lane(self, device_id: str) -> None:
+        """Forget the lane of a JDownloader that went offline."""
+        lane = self._lanes.get(device_id)
+        if lane is not None and not lane.locked():
+            del self._lanes[device_id]
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the queue stats per priority."""
+        return {
+            PRIORITY_NAMES[priority]: stats.as_dict()
+            for priority, stats in self._stats.items()
+        }
+
+
+def jittered(seconds: float) -> float:
+    """Return a delay between half and all of seconds, so retries spread out."""
+    return seconds * random.uniform(0.5, 1)
+
+
+class CircuitBreaker:
+    """Stop calling a JDownloader that keeps failing.
+
+    After threshold failures in a row the breaker opens and calls fail fast.
+    Once the backoff window passed, a single call is let through as a probe:
+    it closes the breaker if it succeeds and opens it again for twice as long
+    if it fails.
+    """
+
+    def __init__(self, threshold: int, retry_min: float, retry_max: float) -> None:
+        """Initialize the circuit breaker."""
+        self._threshold = threshold
+        self._retry_min = retry_min
+        self._retry_max = retry_max
+        self._retry_in = retry_min
+        self._open_until = 0.0
+        self._probing = False
+        self.failures = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Return the state of the breaker."""
+        if self.failures < self._threshold:
+            return BREAKER_CLOSED
+        if self._probing or time.monotonic() >= self._open_until:
+            return BREAKER_HALF_OPEN
+        return BREAKER_OPEN
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the next probe, 0 if calls pass."""
+        if self.failures < self._threshold:
+            return 0
+        return max(self._open_until - time.monotonic(), 0)
+
+    def allow(self) -> bool:
+        """Return True if a call may run, claiming the probe if half open."""
+        if self.failures < self._threshold:
+            return True
+        if self._probing or time.monotonic() < self._open_until:
+            self.rejected += 1
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        """Close the breaker, the JDownloader responded."""
+        self.failures = 0
+        self._retry_in = self._retry_min
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failed call, return True if the breaker opened because of it."""
+        self.failures += 1
+        self._probing = False
+        if self.failures < self._threshold:
+            return False
+        self._open_until = time.monotonic() + jittered(self._retry_in)
+        self._retry_in = min(self._retry_in * 2, self._retry_max)
+        return True
+
+    def release(self) -> None:
+        """Give the probe back, if it is still claimed once a call ended."""
+        self._probing = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the breaker."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in": round(self.retry_in),
+        }
@@ -5,40 +5,90 @@ from __future__ import annotations
 import datetime
 from typing import Any
 
-from myjdapi.myjdapi import Jddevice
 import voluptuous as vol
 
 from homeassistant.components.sensor import DOMAIN, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EntityCategory, UnitOfDataRate
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfDataRate,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, SupportsResponse, callback
 from homeassistant.helpers import config_validation as cv, entity_platform
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import MyJDownloaderHub
+from .api import (
+    DOWNLOADS_LINKS_FIELDS,
+    DOWNLOADS_PACKAGES_FIELDS,
+    LINKGRABBER_LINKS_FIELDS,
+    MyJDownloaderDevice,
+)
 from .const import (
+    ATTR_BYTES_LOADED,
+    ATTR_BYTES_TOTAL,
+    ATTR_FINISHED,
+    ATTR_LARGEST,
     ATTR_LINKS,
+    ATTR_OMITTED,
     ATTR_PACKAGES,
+    ATTR_RANKING_MAX,
+    ATTR_RUNNING,
+    ATTR_SLOWEST,
     DATA_MYJDOWNLOADER_CLIENT,
     DOMAIN as MYJDOWNLOADER_DOMAIN,
+    EVENT_PUBLISHER_DOWNLOADS,
     FIELD_AUTO_EXTRACT,
     FIELD_AUTOSTART,
     FIELD_DESTINATION_FOLDER,
     FIELD_DOWNLOAD_PASSWORD,
     FIELD_EXTRACT_PASSWORD,
+    FIELD_FIELDS,
+    FIELD_HOST,
+    FIELD_LIMIT,
     FIELD_LINKS,
+    FIELD_NAME,
     FIELD_OVERWRITE_PACKAGIZER_RULES,
     FIELD_PACKAGE_NAME,
+    FIELD_PACKAGES,
     FIELD_PRIORITY,
+    FIELD_STATUS,
+    QUERY_LIMIT_DEFAULT,
+    QUERY_LIMIT_MAX,
     SCAN_INTERVAL_SECONDS,
     SERVICE_ADD_LINKS,
+    SERVICE_ADD_LINKS_BATCH,
+    SERVICE_QUERY_LINKGRABBER,
+    SERVICE_QUERY_LINKS,
+    SERVICE_QUERY_PACKAGES,
     SERVICE_RESTART_AND_UPDATE,
     SERVICE_RUN_UPDATE_CHECK,
     SERVICE_START_DOWNLOADS,
     SERVICE_STOP_DOWNLOADS,
+    SNAPSHOT_ACTIVE_PACKAGES,
+    SNAPSHOT_BYTES_REMAINING,
+    SNAPSHOT_ETA,
+    SNAPSHOT_HOST_SPEEDS,
+    SNAPSHOT_PACKAGES,
+    SNAPSHOT_PROGRESS,
+    SNAPSHOT_SPEED,
+    SNAPSHOT_STATE,
+    MyJDownloaderEntityFeature,
 )
-from .entities import MyJDownloaderDeviceEntity, MyJDownloaderEntity
+from .entities import (
+    MyJDownloaderCoordinatorEntity,
+    MyJDownloaderDeviceEntity,
+    MyJDownloaderEntity,
+    MyJDownloaderEventEntity,
+)
+from .store import MyJDownloaderItemTable
 
 SCAN_INTERVAL = datetime.timedelta(seconds=SCAN_INTERVAL_SECONDS)
 
@@ -53,24 +103,70 @@ async def async_setup_entry(
     hub = hass.data[MYJDOWNLOADER_DOMAIN][entry.entry_id][DATA_MYJDOWNLOADER_CLIENT]
 
     # This device-less sensor periodically fetches the list of currently online devices
-    async_add_entities([MyJDownloaderJDownloadersOnlineSensor(hub)], True)
+    # the hub listed or restored them during setup, do not list them again now
+    async_add_entities([MyJDownloaderJDownloadersOnlineSensor(hub)])
 
     @callback
     def async_add_sensor(devices=hub.devices):
         entities = []
+        coordinator_entities = []
 
         for device_id in devices:
             if DOMAIN not in hub.devices_platforms[device_id]:
                 hub.devices_platforms[device_id].add(DOMAIN)
                 entities += [
-                    MyJDownloaderDownloadSpeedSensor(hub, device_id),
-                    MyJDownloaderPackagesSensor(hub, device_id),
                     MyJDownloaderLinksSensor(hub, device_id),
+                    MyJDownloaderApiCallsSensor(hub, device_id),
+                    MyJDownloaderApiTimeSensor(hub, device_id),
+                ]
+                coordinator_entities += [
+                    MyJDownloaderDownloadSpeedSensor(hub, device_id),
                     MyJDownloaderStatusSensor(hub, device_id),
+                    MyJDownloaderPackagesSensor(hub, device_id),
+                    MyJDownloaderSnapshotSensor(
+                        hub,
+                        device_id,
+                        "JDownloader $device_name Remaining",
+                        "mdi:download-box",
+                        "bytes_remaining",
+                        UnitOfInformation.GIGABYTES,
+                        SNAPSHOT_BYTES_REMAINING,
+                        1_000_000_000,
+                    ),
+                    MyJDownloaderSnapshotSensor(
+                        hub,
+                        device_id,
+                        "JDownloader $device_name ETA",
+                        "mdi:timer-sand",
+                        "eta",
+                        UnitOfTime.SECONDS,
+                        SNAPSHOT_ETA,
+                    ),
+                    MyJDownloaderSnapshotSensor(
+                        hub,
+                        device_id,
+                        "JDownloader $device_name Progress",
+                        "mdi:progress-download",
+                        "progress",
+                        PERCENTAGE,
+                        SNAPSHOT_PROGRESS,
+                    ),
+                    MyJDownloaderSnapshotSensor(
+                        hub,
+                        device_id,
+                        "JDownloader $device_name Active Packages",
+                        "mdi:package-variant",
+                        "active_packages",
+                        None,
+                        SNAPSHOT_ACTIVE_PACKAGES,
+                    ),
+                    MyJDownloaderActiveHostsSensor(hub, device_id),
                 ]
 
         if entities:
             async_add_entities(entities, True)
+        if coordinator_entities:
+            async_add_entities(coordinator_entities)
 
     entry.async_on_unload(
         async_dispatcher_connect(
@@ -119,6 +215,54 @@ async def async_setup_entry(
         },
         "add_links",
     )
+    platform.async_register_entity_service(
+        SERVICE_ADD_LINKS_BATCH,
+        {
+            vol.Required(FIELD_PACKAGES): vol.All(
+                cv.ensure_list,
+                [
+                    vol.Schema(
+                        {
+                            vol.Required(FIELD_LINKS): cv.ensure_list(cv.url),
+                            vol.Optional(FIELD_PRIORITY, default="default"): cv.string,
+                            vol.Optional(FIELD_PACKAGE_NAME): cv.string,
+                            vol.Optional(FIELD_AUTOSTART): cv.boolean,
+                            vol.Optional(FIELD_AUTO_EXTRACT): cv.boolean,
+                            vol.Optional(FIELD_EXTRACT_PASSWORD): cv.string,
+                            vol.Optional(FIELD_DOWNLOAD_PASSWORD): cv.string,
+                            vol.Optional(FIELD_DESTINATION_FOLDER): cv.string,
+                            vol.Optional(FIELD_OVERWRITE_PACKAGIZER_RULES): cv.boolean,
+                        }
+                    )
+                ],
+            )
+        },
+        "add_links_batch",
+        # only the status sensor adds the links, once per JDownloader
+        required_features=[MyJDownloaderEntityFeature.RESPONSE_SERVICES],
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    for service, fields in (
+        (SERVICE_QUERY_PACKAGES, DOWNLOADS_PACKAGES_FIELDS),
+        (SERVICE_QUERY_LINKS, DOWNLOADS_LINKS_FIELDS),
+        (SERVICE_QUERY_LINKGRABBER, LINKGRABBER_LINKS_FIELDS),
+    ):
+        platform.async_register_entity_service(
+            service,
+            {
+                vol.Optional(FIELD_FIELDS): vol.All(cv.ensure_list, [vol.In(fields)]),
+                vol.Optional(FIELD_STATUS): cv.string,
+                vol.Optional(FIELD_HOST): cv.string,
+                vol.Optional(FIELD_NAME): cv.string,
+                vol.Optional(FIELD_LIMIT, default=QUERY_LIMIT_DEFAULT): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=QUERY_LIMIT_MAX)
+                ),
+            },
+            service,
+            # only the status sensor answers, one response per JDownloader
+            required_features=[MyJDownloaderEntityFeature.RESPONSE_SERVICES],
+            supports_response=SupportsResponse.ONLY,
+        )
 
 
 class MyJDownloaderDeviceSensor(MyJDownloaderDeviceEntity, SensorEntity):
@@ -233,7 +377,26 @@ class MyJDownloaderJDownloadersOnlineSensor(MyJDownloaderSensor):
         super().__init__(
             hub, "JDownloaders Online", "mdi:download-multiple", "number", None, None
         )
-        self.devices: dict[str, Jddevice] = {}
+        self.devices: dict[str, MyJDownloaderDevice] = hub.devices
+        self._state = str(len(self.devices))
+
+    async def async_added_to_hass(self) -> None:
+        """Follow changes of the online devices between updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{MYJDOWNLOADER_DOMAIN}_devices_changed",
+                self._handle_devices_changed,
+            )
+        )
+
+    @callback
+    def _handle_devices_changed(self) -> None:
+        """Update the sensor after the hub listed the online devices."""
+        self.devices = self.hub.devices
+        self._state = str(len(self.devices))
+        self.async_write_ha_state()
 
     async def _myjdownloader_update(self) -> None:
         """Update MyJDownloader entity."""
@@ -251,9 +414,13 @@ class MyJDownloaderJDownloadersOnlineSensor(MyJDownloaderSensor):
         }
 
 
-class MyJDownloaderDownloadSpeedSensor(MyJDownloaderDeviceSensor):
+class MyJDownloaderDownloadSpeedSensor(
+    MyJDownloaderCoordinatorEntity, MyJDownloaderDeviceSensor
+):
     """Defines a MyJDownloader download speed sensor."""
 
+    _snapshot_keys = frozenset({SNAPSHOT_SPEED})
+
     def __init__(
         self,
         hub: MyJDownloaderHub,
@@ -270,54 +437,127 @@ class MyJDownloaderDownloadSpeedSensor(MyJDownloaderDeviceSensor):
             SensorStateClass.MEASUREMENT,
         )
 
-    async def _myjdownloader_update(self) -> None:
-        """Update MyJDownloader entity."""
-        device = self.hub.get_device(self._device_id)
-        self._state = round(
-            await self.hub.async_query(device.downloadcontroller.get_speed_in_bytes)
-            / 1_000_000,
-            2,
-        )
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        self._state = round(data[SNAPSHOT_SPEED] / 1_000_000, 2)
+
 
+class MyJDownloaderItemsSensor(MyJDownloaderDeviceSensor):
+    """Defines a MyJDownloader sensor of the links or packages in the download list.
 
-class MyJDownloaderPackagesSensor(MyJDownloaderDeviceSensor):
-    """Defines a MyJDownloader packages sensor."""
+    The items are kept in a table of the device store. State attributes list
+    a bounded number of them and totals over all of them. The lists are not
+    recorded, all items are available through the websocket API.
+    """
+
+    _unrecorded_attributes = frozenset(
+        {ATTR_LARGEST, ATTR_LINKS, ATTR_PACKAGES, ATTR_SLOWEST}
+    )
 
     def __init__(
         self,
         hub: MyJDownloaderHub,
         device_id: str,
+        name_template: str,
+        icon: str,
+        measurement: str,
     ) -> None:
         """Initialize MyJDownloader sensor."""
-        self._packages_list: list = []
         super().__init__(
             hub,
             device_id,
-            "JDownloader $device_name Packages",
-            "mdi:package-down",
-            "packages",
+            name_template,
+            icon,
+            measurement,
             None,
             None,
             None,
             False,
         )
 
-    async def _myjdownloader_update(self) -> None:
-        """Update MyJDownloader entity."""
-        device = self.hub.get_device(self._device_id)
-        self._packages_list = await self.hub.async_query(
-            device.downloads.query_packages
-        )
-        self._state = str(len(self._packages_list))
+    @property
+    def _table(self) -> MyJDownloaderItemTable:
+        """Return the table of the items in the device store."""
+        return getattr(self.hub.stores[self._device_id], self.measurement)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
-        return {ATTR_PACKAGES: self._packages_list}
+        table = self._table
+        records = table.records
+        bytes_total = table.columns["bytesTotal"]
+        speed = table.columns["speed"]
+        summary = table.first_rows(
+            self.hub.attribute_items,
+            # running and unfinished items first
+            lambda row: (not records[row].running, records[row].finished),
+        )
+        attributes: dict[str, Any] = {}
+        if self.hub.attribute_items:
+            attributes[self.measurement] = [table.render(row) for row in summary]
+        return attributes | {
+            ATTR_OMITTED: len(table) - len(summary),
+            ATTR_RUNNING: table.count("running"),
+            ATTR_FINISHED: table.count("finished"),
+            ATTR_BYTES_LOADED: table.total("bytesLoaded"),
+            ATTR_BYTES_TOTAL: table.total("bytesTotal"),
+            ATTR_LARGEST: [
+                {"name": records[row].name, "bytesTotal": bytes_total[row]}
+                for row in table.first_rows(
+                    ATTR_RANKING_MAX, lambda row: -bytes_total[row]
+                )
+            ],
+            ATTR_SLOWEST: [
+                {"name": records[row].name, "speed": speed[row]}
+                for row in table.first_rows(
+                    ATTR_RANKING_MAX,
+                    lambda row: speed[row],
+                    lambda row: records[row].running,
+                )
+            ],
+        }
+
+
+class MyJDownloaderPackagesSensor(
+    MyJDownloaderCoordinatorEntity, MyJDownloaderItemsSensor
+):
+    """Defines a MyJDownloader packages sensor.
+
+    The device coordinator queries the packages with the snapshot.
+    """
+
+    _snapshot_keys = frozenset({SNAPSHOT_PACKAGES})
+
+    def __init__(
+        self,
+        hub: MyJDownloaderHub,
+        device_id: str,
+    ) -> None:
+        """Initialize MyJDownloader sensor."""
+        super().__init__(
+            hub,
+            device_id,
+            "JDownloader $device_name Packages",
+            "mdi:package-down",
+            ATTR_PACKAGES,
+        )
+
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        self._state = str(len(self._table))
+
+
+class MyJDownloaderLinksSensor(MyJDownloaderEventEntity, MyJDownloaderItemsSensor):
+    """Defines a MyJDownloader links sensor.
 
+    Links are streamed page by page into the table of the device store, that
+    computes the add/update/remove delta sent through the dispatcher. After
+    download events only the packages named in the events are fetched again.
+    """
 
-class MyJDownloaderLinksSensor(MyJDownloaderDeviceSensor):
-    """Defines a MyJDownloader links sensor."""
+    _event_publishers = (EVENT_PUBLISHER_DOWNLOADS,)
 
     def __init__(
         self,
@@ -325,34 +565,252 @@ class MyJDownloaderLinksSensor(MyJDownloaderDeviceSensor):
         device_id: str,
     ) -> None:
         """Initialize MyJDownloader sensor."""
-        self._links_list: list = []
+        # packages changed since the last update, None if all need fetching
+        self._changed_packages: set[int] | None = None
         super().__init__(
             hub,
             device_id,
             "JDownloader $device_name Links",
             "mdi:link-box",
-            "links",
+            ATTR_LINKS,
+        )
+
+    @callback
+    def _myjdownloader_handle_events(self, events: list[dict]) -> None:
+        """Take note of the packages that changed."""
+        if self._changed_packages is None:
+            return
+        for event in events:
+            package_uuid = None
+            data = event.get("eventData")
+            if isinstance(data, dict) and "uuid" in data:
+                if event.get("eventid", "").startswith("PACKAGE_"):
+                    package_uuid = data["uuid"]
+                else:
+                    package_uuid = data.get("packageUUID") or self._table.group_of(
+                        data["uuid"]
+                    )
+            if package_uuid is None:
+                self._changed_packages = None
+                return
+            self._changed_packages.add(package_uuid)
+
+    async def _myjdownloader_update(self) -> None:
+        """Update MyJDownloader entity."""
+        device = self.hub.get_device(self._device_id)
+        changed_packages, self._changed_packages = self._changed_packages, None
+        package_uuids = sorted(changed_packages) if changed_packages else None
+
+        table = self._table
+        table.start(package_uuids)
+        urls = self.hub.stores[self._device_id].urls
+        # URLs are always queried for the index, only kept if configured
+        keep_urls = "url" in self.hub.link_fields
+        async for items in self.hub.async_iter_links(device, package_uuids):
+            # links in the download list need not be submitted again
+            urls.add(item["url"] for item in items if item.get("url"))
+            if not keep_urls:
+                items = [
+                    {key: value for key, value in item.items() if key != "url"}
+                    for item in items
+                ]
+            table.add(items)
+        delta = table.finish()
+
+        self._changed_packages = set()
+        self._state = str(len(table))
+        if delta:
+            async_dispatcher_send(
+                self.hass,
+                f"{MYJDOWNLOADER_DOMAIN}_{ATTR_LINKS}_changed_{self._device_id}",
+                delta,
+            )
+
+
+class MyJDownloaderSnapshotSensor(
+    MyJDownloaderCoordinatorEntity, MyJDownloaderDeviceSensor
+):
+    """Defines a MyJDownloader sensor of a value derived from the packages."""
+
+    def __init__(
+        self,
+        hub: MyJDownloaderHub,
+        device_id: str,
+        name_template: str,
+        icon: str,
+        measurement: str,
+        unit_of_measurement: str | None,
+        snapshot_key: str,
+        scale: float = 1,
+    ) -> None:
+        """Initialize MyJDownloader sensor."""
+        self._snapshot_key = snapshot_key
+        self._snapshot_keys = frozenset({snapshot_key})
+        self._scale = scale
+        super().__init__(
+            hub,
+            device_id,
+            name_template,
+            icon,
+            measurement,
+            unit_of_measurement,
+            SensorStateClass.MEASUREMENT,
+        )
+
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        value = data.get(self._snapshot_key)
+        self._state = None if value is None else round(value / self._scale, 2)
+
+
+class MyJDownloaderActiveHostsSensor(
+    MyJDownloaderCoordinatorEntity, MyJDownloaderDeviceSensor
+):
+    """Defines a MyJDownloader sensor of the hosts downloaded from."""
+
+    _snapshot_keys = frozenset({SNAPSHOT_HOST_SPEEDS})
+
+    def __init__(
+        self,
+        hub: MyJDownloaderHub,
+        device_id: str,
+    ) -> None:
+        """Initialize MyJDownloader sensor."""
+        self._host_speeds: dict[str, float] = {}
+        super().__init__(
+            hub,
+            device_id,
+            "JDownloader $device_name Active Hosts",
+            "mdi:server-network",
+            "active_hosts",
             None,
+            SensorStateClass.MEASUREMENT,
             None,
+            False,
+        )
+
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        self._host_speeds = data.get(SNAPSHOT_HOST_SPEEDS) or {}
+        self._state = len(self._host_speeds)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the download speed per host in MB/s."""
+        return {
+            host: round(speed / 1_000_000, 2)
+            for host, speed in sorted(self._host_speeds.items())
+        }
+
+
+class MyJDownloaderApiCallsSensor(MyJDownloaderDeviceSensor):
+    """Defines a MyJDownloader sensor of the API calls to a JDownloader."""
+
+    _unrecorded_attributes = frozenset({"methods"})
+
+    def __init__(
+        self,
+        hub: MyJDownloaderHub,
+        device_id: str,
+    ) -> None:
+        """Initialize MyJDownloader sensor."""
+        self._attributes: dict[str, Any] = {}
+        super().__init__(
+            hub,
+            device_id,
+            "JDownloader $device_name API Calls",
+            "mdi:api",
+            "api_calls",
             None,
+            SensorStateClass.TOTAL_INCREASING,
+            EntityCategory.DIAGNOSTIC,
             False,
         )
 
     async def _myjdownloader_update(self) -> None:
         """Update MyJDownloader entity."""
-        device = self.hub.get_device(self._device_id)
-        self._links_list = await self.hub.async_query(device.downloads.query_links)
-        self._state = str(len(self._links_list))
+        stats = self.hub.instrumentation.device_stats(self._device_id)
+        self._state = stats.calls
+        self._attributes = {
+            "errors": dict(stats.errors),
+            "rejected": stats.rejected,
+            "methods": {
+                method: method_stats.calls
+                for method, method_stats in sorted(
+                    self.hub.instrumentation.method_stats(self._device_id).items()
+                )
+            },
+        }
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        return {ATTR_LINKS: self._links_list}
+        """Return the errors per exception class and the calls per method."""
+        return self._attributes
+
+
+class MyJDownloaderApiTimeSensor(MyJDownloaderDeviceSensor):
+    """Defines a MyJDownloader sensor of the time spent in API calls.
 
+    The state is the time calls to the JDownloader ran, the attributes hold
+    the histograms of queue wait, run time and payload size.
+    """
 
-class MyJDownloaderStatusSensor(MyJDownloaderDeviceSensor):
+    _unrecorded_attributes = frozenset({"methods", "payload", "run", "wait"})
+
+    def __init__(
+        self,
+        hub: MyJDownloaderHub,
+        device_id: str,
+    ) -> None:
+        """Initialize MyJDownloader sensor."""
+        self._attributes: dict[str, Any] = {}
+        super().__init__(
+            hub,
+            device_id,
+            "JDownloader $device_name API Time",
+            "mdi:timer-outline",
+            "api_time",
+            UnitOfTime.SECONDS,
+            SensorStateClass.TOTAL_INCREASING,
+            EntityCategory.DIAGNOSTIC,
+            False,
+        )
+
+    async def _myjdownloader_update(self) -> None:
+        """Update MyJDownloader entity."""
+        stats = self.hub.instrumentation.device_stats(self._device_id)
+        self._state = round(stats.run.total, 1)
+        methods = self.hub.instrumentation.method_stats(self._device_id)
+        self._attributes = {
+            "wait_total": round(stats.wait.total, 1),
+            # methods taking the most time first
+            "methods": {
+                method: round(method_stats.run.total, 2)
+                for method, method_stats in sorted(
+                    methods.items(), key=lambda item: item[1].run.total, reverse=True
+                )
+            },
+            "wait": stats.wait.as_dict(),
+            "run": stats.run.as_dict(),
+            "payload": stats.payload.as_dict(),
+        }
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the run time per method and the histograms."""
+        return self._attributes
+
+
+class MyJDownloaderStatusSensor(
+    MyJDownloaderCoordinatorEntity, MyJDownloaderDeviceSensor
+):
     """Defines a MyJDownloader status sensor."""
 
+    _snapshot_keys = frozenset({SNAPSHOT_STATE})
+    _attr_supported_features = MyJDownloaderEntityFeature.RESPONSE_SERVICES
+
     STATE_ICONS = {
         "idle": "mdi:stop",
         "running": "mdi:play",
@@ -383,11 +841,10 @@ class MyJDownloaderStatusSensor(MyJDownloaderDeviceSensor):
             return MyJDownloaderStatusSensor.STATE_ICONS.get(self._state, self._icon)
         return self._icon
 
-    async def _myjdownloader_update(self) -> None:
-        """Update MyJDownloader entity."""
-        device = self.hub.get_device(self._device_id)
-        status = await self.hub.async_query(device.downloadcontroller.get_current_state)
-        status = status.lower()
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        status = data[SNAPSHOT_STATE].lower()
         status = status.replace("_state", "")  # stopped_state -> stopped
         status = "paused" if status == "pause" else status  # pause -> paused
         self._state = status
@@ -0,0 +1,306 @@
+"""Compact store of the links and packages of a JDownloader."""
+
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+import heapq
+import time
+from typing import Any
+
+from .const import (
+    SNAPSHOT_ACTIVE_PACKAGES,
+    SNAPSHOT_BYTES_REMAINING,
+    SNAPSHOT_ETA,
+    SNAPSHOT_HOST_SPEEDS,
+    SNAPSHOT_PACKAGES,
+    SNAPSHOT_PROGRESS,
+    URL_INDEX_MAX_SIZE,
+    URL_INDEX_TTL_SECONDS,
+)
+
+# numeric fields of links and packages, kept in array columns
+NUMERIC_FIELDS = ("bytesLoaded", "bytesTotal", "eta", "speed")
+_RECORD_KEYS = {"uuid", "name", "status", "running", "finished", *NUMERIC_FIELDS}
+
+
+@dataclass
+class ItemDelta:
+    """UUIDs of the items that were added, updated or removed."""
+
+    added: list[int] = field(default_factory=list)
+    updated: list[int] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Return True if any item changed."""
+        return bool(self.added or self.updated or self.removed)
+
+
+class ItemRecord:
+    """The non-numeric fields of a link or package."""
+
+    __slots__ = (
+        "extra",
+        "fingerprint",
+        "finished",
+        "name",
+        "package_uuid",
+        "running",
+        "status",
+        "uuid",
+    )
+
+    def __init__(self, item: dict[str, Any], group_key: str) -> None:
+        """Initialize the record from a queried item."""
+        self.uuid: int = item["uuid"]
+        self.package_uuid: int | None = item.get(group_key)
+        self.name: str | None = item.get("name")
+        self.status: str | None = item.get("status")
+        self.running = bool(item.get("running"))
+        self.finished = bool(item.get("finished"))
+        self.fingerprint = hash(repr(item))
+        # fields without a slot, only allocated if any were queried
+        extra = {
+            key: value
+            for key, value in item.items()
+            if key not in _RECORD_KEYS and key != group_key
+        }
+        self.extra: dict[str, Any] | None = extra or None
+
+
+class MyJDownloaderItemTable:
+    """Links or packages of a JDownloader as records and numeric columns.
+
+    The table is rebuilt on each refresh from items streamed page by page and
+    computes the add/update/remove delta on the way. Items belong to a
+    package, given by group_key (the UUID of the package itself for
+    packages), so the items of some packages can be replaced without
+    fetching all items again.
+    """
+
+    def __init__(self, group_key: str) -> None:
+        """Initialize the item table."""
+        self._group_key = group_key
+        self.records: list[ItemRecord] = []
+        self.columns: dict[str, array] = {name: array("q") for name in NUMERIC_FIELDS}
+        self._fields: set[str] = set()
+        self._rows: dict[int, int] = {}
+        self._next: MyJDownloaderItemTable | None = None
+        self._delta = ItemDelta()
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return len(self.records)
+
+    def group_of(self, uuid: int) -> int | None:
+        """Return the package of a known item."""
+        if (row := self._rows.get(uuid)) is None:
+            return None
+        return self.records[row].package_uuid
+
+    def start(self, group_uuids: Iterable[int] | None = None) -> None:
+        """Start replacing the items of some packages, or all items."""
+        self._next = MyJDownloaderItemTable(self._group_key)
+        self._delta = ItemDelta()
+        if group_uuids is None:
+            return
+        group_uuids = set(group_uuids)
+        self._next._fields = set(self._fields)
+        for row, record in enumerate(self.records):
+            if record.package_uuid not in group_uuids:
+                self._next._append(
+                    record, [self.columns[name][row] for name in NUMERIC_FIELDS]
+                )
+
+    def add(self, items: Iterable[dict[str, Any]]) -> None:
+        """Add fetched items to the table being built."""
+        assert self._next is not None
+        for item in items:
+            record = ItemRecord(item, self._group_key)
+            self._next._fields.update(name for name in NUMERIC_FIELDS if name in item)
+            values = [item.get(name) or 0 for name in NUMERIC_FIELDS]
+            if (row := self._next._rows.get(record.uuid)) is not None:
+                # the list moved between pages and the item was returned twice
+                self._next._set(row, record, values)
+                continue
+            self._next._append(record, values)
+            if (old_row := self._rows.get(record.uuid)) is None:
+                self._delta.added.append(record.uuid)
+            elif self.records[old_row].fingerprint != record.fingerprint:
+                self._delta.updated.append(record.uuid)
+
+    def finish(self) -> ItemDelta:
+        """Replace the table with the one built and return what changed."""
+        assert self._next is not None
+        table, self._next = self._next, None
+        delta, self._delta = self._delta, ItemDelta()
+        delta.removed = [uuid for uuid in self._rows if uuid not in table._rows]
+        self.records = table.records
+        self.columns = table.columns
+        self._fields = table._fields
+        self._rows = table._rows
+        return delta
+
+    def _append(self, record: ItemRecord, values: list[int]) -> None:
+        """Append a row."""
+        self._rows[record.uuid] = len(self.records)
+        self.records.append(record)
+        for name, value in zip(NUMERIC_FIELDS, values):
+            self.columns[name].append(value)
+
+    def _set(self, row: int, record: ItemRecord, values: list[int]) -> None:
+        """Overwrite a row."""
+        self.records[row] = record
+        for name, value in zip(NUMERIC_FIELDS, values):
+            self.columns[name][row] = value
+
+    def total(self, name: str) -> int:
+        """Return the sum of a numeric column."""
+        return sum(self.columns[name])
+
+    def count(self, flag: str) -> int:
+        """Return the number of items with a flag (running or finished) set."""
+        return sum(getattr(record, flag) for record in self.records)
+
+    def first_rows(
+        self,
+        n: int,
+        key: Callable[[int], Any],
+        predicate: Callable[[int], bool] | None = None,
+    ) -> list[int]:
+        """Return the first n rows ordered by key."""
+        rows: Iterable[int] = range(len(self.records))
+        if predicate is not None:
+            rows = filter(predicate, rows)
+        return heapq.nsmallest(n, rows, key=key)
+
+    def render(self, row: int) -> dict[str, Any]:
+        """Return an item as the API returned it."""
+        record = self.records[row]
+        item: dict[str, Any] = {
+            "uuid": record.uuid,
+            "name": record.name,
+            "running": record.running,
+            "finished": record.finished,
+        }
+        if record.status is not None:
+            item["status"] = record.status
+        if self._group_key != "uuid":
+            item[self._group_key] = record.package_uuid
+        for name in NUMERIC_FIELDS:
+            if name in self._fields:
+                item[name] = self.columns[name][row]
+        if record.extra:
+            item.update(record.extra)
+        return item
+
+
+class MyJDownloaderUrlIndex:
+    """Hashes of URLs submitted to or seen on a JDownloader.
+
+    Memory is bounded: entries expire after a while and the least recently
+    used ones are evicted first once the index is full.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Initialize the URL index."""
+        self._max_size = max_size
+        self._ttl = ttl
+        # hash of the URL -> expiry
+        self._entries: OrderedDict[int, float] = OrderedDict()
+        self.submitted = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        """Return the number of URLs in the index."""
+        return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        """Return True if the URL was submitted or seen recently."""
+        key = hash(url)
+        expiry = self._entries.get(key)
+        if expiry is None:
+            return False
+        if expiry < time.monotonic():
+            del self._entries[key]
+            return False
+        return True
+
+    def add(self, urls: Iterable[str]) -> None:
+        """Remember URLs, refreshing known ones."""
+        expiry = time.monotonic() + self._ttl
+        for url in urls:
+            key = hash(url)
+            self._entries[key] = expiry
+            self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, urls: Iterable[str]) -> None:
+        """Forget URLs, e.g. when submitting them failed."""
+        for url in urls:
+            self._entries.pop(hash(url), None)
+
+    def filter(self, urls: Iterable[str]) -> list[str]:
+        """Return the unknown URLs and remember them as submitted."""
+        new_urls = []
+        for url in urls:
+            if url in self:
+                self.skipped += 1
+            else:
+                new_urls.append(url)
+                self.add([url])
+        self.submitted += len(new_urls)
+        return new_urls
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters of the index."""
+        return {
+            "size": len(self),
+            "submitted": self.submitted,
+            "skipped": self.skipped,
+        }
+
+
+class MyJDownloaderDeviceStore:
+    """The links, packages and known URLs of a JDownloader, shared by its entities."""
+
+    def __init__(self) -> None:
+        """Initialize the device store."""
+        self.links = MyJDownloaderItemTable("packageUUID")
+        self.packages = MyJDownloaderItemTable("uuid")
+        self.urls = MyJDownloaderUrlIndex(URL_INDEX_MAX_SIZE, URL_INDEX_TTL_SECONDS)
+
+    def package_summary(self) -> dict[str, Any]:
+        """Return the progress of all packages, computed over the columns."""
+        packages = self.packages
+        bytes_loaded = packages.total("bytesLoaded")
+        bytes_total = packages.total("bytesTotal")
+        speed = packages.total("speed")
+        bytes_remaining = max(bytes_total - bytes_loaded, 0)
+
+        # a package downloading from several hosts is split evenly among them
+        host_speeds: dict[str, float] = {}
+        for row, package_speed in enumerate(packages.columns["speed"]):
+            if not package_speed:
+                continue
+            extra = packages.records[row].extra or {}
+            hosts = extra.get("hosts") or ["unknown"]
+            for host in hosts:
+                host_speeds[host] = host_speeds.get(host, 0) + package_speed / len(
+                    hosts
+                )
+
+        return {
+            SNAPSHOT_ACTIVE_PACKAGES: packages.count("running"),
+            SNAPSHOT_BYTES_REMAINING: bytes_remaining,
+            SNAPSHOT_ETA: round(bytes_remaining / speed) if speed else None,
+            SNAPSHOT_HOST_SPEEDS: host_speeds,
+            SNAPSHOT_PACKAGES: len(packages),
+            SNAPSHOT_PROGRESS: (
+                round(bytes_loaded / bytes_total * 100, 1) if bytes_total else None
+            ),
+        }
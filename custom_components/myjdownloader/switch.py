@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import datetime
 import logging
+import time
 from typing import Any
 
 from myjdapi.myjdapi import MYJDException
@@ -11,17 +12,22 @@ from myjdapi.myjdapi import MYJDException
 from homeassistant.components.switch import DOMAIN, SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 
 from . import MyJDownloaderHub
 from .const import (
     DATA_MYJDOWNLOADER_CLIENT,
     DOMAIN as MYJDOWNLOADER_DOMAIN,
+    EVENT_SWITCH_FAILED,
     SCAN_INTERVAL_SECONDS,
+    SNAPSHOT_LIMIT,
+    SNAPSHOT_STATE,
+    SWITCH_CONFIRM_SECONDS,
 )
-from .entities import MyJDownloaderDeviceEntity
+from .entities import MyJDownloaderCoordinatorEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,7 +56,7 @@ async def async_setup_entry(
                 ]
 
         if entities:
-            async_add_entities(entities, True)
+            async_add_entities(entities)
 
     entry.async_on_unload(
         async_dispatcher_connect(
@@ -61,8 +67,13 @@ async def async_setup_entry(
     async_add_switch(hub.devices)
 
 
-class MyJDownloaderSwitch(MyJDownloaderDeviceEntity, SwitchEntity):
-    """Defines a MyJDownloader switch."""
+class MyJDownloaderSwitch(MyJDownloaderCoordinatorEntity, SwitchEntity):
+    """Defines a MyJDownloader switch.
+
+    A new state is shown as soon as the switch is toggled. Snapshots have to
+    confirm it within a few seconds, otherwise it is rolled back and an event
+    is fired; snapshots in between may predate the change and are ignored.
+    """
 
     def __init__(
         self,
@@ -76,6 +87,9 @@ class MyJDownloaderSwitch(MyJDownloaderDeviceEntity, SwitchEntity):
     ) -> None:
         """Initialize MyJDownloader switch."""
         self._state = False
+        # state waiting for confirmation and when the window for it closes
+        self._pending: tuple[bool, float] | None = None
+        self._cancel_confirm: CALLBACK_TYPE | None = None
         self._key = key
         super().__init__(hub, device_id, name, icon, entity_category, enabled_default)
 
@@ -89,13 +103,19 @@ class MyJDownloaderSwitch(MyJDownloaderDeviceEntity, SwitchEntity):
         """Return the state of the switch."""
         return self._state
 
+    async def async_added_to_hass(self) -> None:
+        """Stop waiting for a confirmation when removed."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._clear_pending)
+
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the switch."""
+        previous = self._apply(False)
         try:
             await self._myjdownloader_turn_off()
         except MYJDException:
             _LOGGER.error("An error occurred while turning off MyJDownloader switch")
-            self._available = False
+            self._rollback(previous, "error")
 
     async def _myjdownloader_turn_off(self) -> None:
         """Turn off the switch."""
@@ -103,20 +123,82 @@ class MyJDownloaderSwitch(MyJDownloaderDeviceEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the switch."""
+        previous = self._apply(True)
         try:
             await self._myjdownloader_turn_on()
         except MYJDException:
             _LOGGER.error("An error occurred while turning on MyJDownloader switch")
-            self._available = False
+            self._rollback(previous, "error")
 
     async def _myjdownloader_turn_on(self) -> None:
         """Turn on the switch."""
         raise NotImplementedError
 
+    @callback
+    def _apply(self, state: bool) -> bool:
+        """Show a new state until confirmed, return the previous one."""
+        previous = self._state
+        self._clear_pending()
+        self._state = state
+        self._pending = (state, time.monotonic() + SWITCH_CONFIRM_SECONDS)
+        self._cancel_confirm = async_call_later(
+            self.hass, SWITCH_CONFIRM_SECONDS, self._async_confirm_timeout
+        )
+        self.async_write_ha_state()
+        return previous
+
+    @callback
+    def _async_confirm_timeout(self, _now: datetime.datetime) -> None:
+        """Fetch the state once more if no snapshot confirmed it in time."""
+        self._cancel_confirm = None
+        if self._pending is not None:
+            self.coordinator.async_mark_dirty(self._snapshot_keys or ())
+
+    @callback
+    def _clear_pending(self) -> None:
+        """Stop waiting for a confirmation."""
+        self._pending = None
+        if self._cancel_confirm is not None:
+            self._cancel_confirm()
+            self._cancel_confirm = None
+
+    @callback
+    def _rollback(self, state: bool, reason: str) -> None:
+        """Show the state of the JDownloader again and report the failure."""
+        if self._pending is not None:
+            self.hass.bus.async_fire(
+                EVENT_SWITCH_FAILED,
+                {
+                    "entity_id": self.entity_id,
+                    "state": self._pending[0],
+                    "reason": reason,
+                },
+            )
+        self._clear_pending()
+        self._state = state
+        self.async_write_ha_state()
+
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        state = self._myjdownloader_switch_state(data)
+        if self._pending is None:
+            self._state = state
+        elif state == self._pending[0]:
+            self._clear_pending()
+        elif time.monotonic() >= self._pending[1]:
+            self._rollback(state, "not_confirmed")
+
+    def _myjdownloader_switch_state(self, data: dict[str, Any]) -> bool:
+        """Return the state of the switch in the device snapshot."""
+        raise NotImplementedError
+
 
 class MyJDownloaderPauseSwitch(MyJDownloaderSwitch):
     """Defines a MyJDownloader pause switch."""
 
+    _snapshot_keys = frozenset({SNAPSHOT_STATE})
+
     def __init__(
         self,
         hub: MyJDownloaderHub,
@@ -133,28 +215,24 @@ class MyJDownloaderPauseSwitch(MyJDownloaderSwitch):
 
     async def _myjdownloader_turn_off(self) -> None:
         """Turn off the switch."""
-        # TODO additionally trigger update of status sensor immediately
-        # http://dev-docs.home-assistant.io/en/master/api/helpers.html#module-homeassistant.helpers.dispatcher
         device = self.hub.get_device(self._device_id)
         await self.hub.async_query(device.downloadcontroller.pause_downloads, False)
 
     async def _myjdownloader_turn_on(self) -> None:
         """Turn on the switch."""
-        # TODO additionally trigger update of status sensor immediately
-        # http://dev-docs.home-assistant.io/en/master/api/helpers.html#module-homeassistant.helpers.dispatcher
         device = self.hub.get_device(self._device_id)
         await self.hub.async_query(device.downloadcontroller.pause_downloads, True)
 
-    async def _myjdownloader_update(self) -> None:
-        """Update MyJDownloader entity."""
-        device = self.hub.get_device(self._device_id)
-        status = await self.hub.async_query(device.downloadcontroller.get_current_state)
-        self._state = status.lower() == "pause"
+    def _myjdownloader_switch_state(self, data: dict[str, Any]) -> bool:
+        """Return the state of the switch in the device snapshot."""
+        return data[SNAPSHOT_STATE].lower() == "pause"
 
 
 class MyJDownloaderLimitSwitch(MyJDownloaderSwitch):
     """Defines a MyJDownloader limit switch."""
 
+    _snapshot_keys = frozenset({SNAPSHOT_LIMIT})
+
     def __init__(
         self,
         hub: MyJDownloaderHub,
@@ -179,9 +257,6 @@ class MyJDownloaderLimitSwitch(MyJDownloaderSwitch):
         device = self.hub.get_device(self._device_id)
         await self.hub.async_query(device.toolbar.enable_downloadSpeedLimit)
 
-    async def _myjdownloader_update(self) -> None:
-        """Update MyJDownloader entity."""
-        device = self.hub.get_device(self._device_id)
-        self._state = await self.hub.async_query(
-            device.toolbar.status_downloadSpeedLimit
-        )
+    def _myjdownloader_switch_state(self, data: dict[str, Any]) -> bool:
+        """Return the state of the switch in the device snapshot."""
+        return data[SNAPSHOT_LIMIT]
@@ -29,9 +29,11 @@ from .const import (
     LATEST_VERSION_SCAN_INTERVAL_SECONDS,
     LATEST_VERSION_URL,
     SCAN_INTERVAL_SECONDS,
+    SNAPSHOT_CORE_REVISION,
+    SNAPSHOT_UPDATE_AVAILABLE,
     TITLE,
 )
-from .entities import MyJDownloaderDeviceEntity
+from .entities import MyJDownloaderCoordinatorEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -59,7 +61,7 @@ async def async_setup_entry(
                 ]
 
         if entities:
-            async_add_entities(entities, True)
+            async_add_entities(entities)
 
     entry.async_on_unload(
         async_dispatcher_connect(
@@ -70,7 +72,7 @@ async def async_setup_entry(
     async_add_update(hub.devices)
 
 
-class MyJDownloaderUpdate(MyJDownloaderDeviceEntity, UpdateEntity):
+class MyJDownloaderUpdate(MyJDownloaderCoordinatorEntity, UpdateEntity):
     """Defines a MyJDownloader update."""
 
     def __init__(
@@ -123,6 +125,7 @@ class MyJDownloaderUpdateEntity(MyJDownloaderUpdate):
 
     _attr_supported_features = UpdateEntityFeature.INSTALL
     _attr_title = TITLE
+    _snapshot_keys = frozenset({SNAPSHOT_CORE_REVISION, SNAPSHOT_UPDATE_AVAILABLE})
 
     def __init__(
         self,
@@ -144,12 +147,11 @@ class MyJDownloaderUpdateEntity(MyJDownloaderUpdate):
         )
         self._latest_version_date: str | None = None
 
-    async def _myjdownloader_update(self) -> None:
-        """Update MyJDownloader entity."""
-        device = self.hub.get_device(self._device_id)
-        update_available = await self.hub.async_query(device.update.is_update_available)
-        if self._state is None or self._update_available != update_available:
-            self._state = await self.hub.async_query(device.jd.get_core_revision)
+    @callback
+    def _myjdownloader_handle_snapshot(self, data: dict[str, Any]) -> None:
+        """Update MyJDownloader entity from the device snapshot."""
+        update_available = data[SNAPSHOT_UPDATE_AVAILABLE]
+        self._state = data[SNAPSHOT_CORE_REVISION]
 
         if LATEST_VERSION_SCAN_INTERVAL_SECONDS > 0 and (
             (self._latest_version is None or self._update_available != update_available)
@@ -162,7 +164,7 @@ class MyJDownloaderUpdateEntity(MyJDownloaderUpdate):
                 > LATEST_VERSION_SCAN_INTERVAL_SECONDS
             )
         ):
-            await self._update_latest_version()
+            self.hass.async_create_task(self._async_refresh_latest_version())
         elif update_available:  # do not do latest version checks
             # Note, a second update will not unskip a previously skipped update
             self._latest_version = str(self._state) + "+"
@@ -170,6 +172,11 @@ class MyJDownloaderUpdateEntity(MyJDownloaderUpdate):
             self._latest_version = str(self._state)
         self._update_available = update_available
 
+    async def _async_refresh_latest_version(self) -> None:
+        """Query the latest core revision and write the new state."""
+        await self._update_latest_version()
+        self.async_write_ha_state()
+
     @Throttle(datetime.timedelta(seconds=SCAN_INTERVAL_SECONDS))
     async def _update_latest_version(self) -> None:
         """Query the latest core revision."""
@@ -190,3 +197,4 @@ class MyJDownloaderUpdateEntity(MyJDownloaderUpdate):
         """Install update."""
         device = self.hub.get_device(self._device_id)
         await self.hub.async_query(device.update.restart_and_update)
+        self.coordinator.request_update_check()
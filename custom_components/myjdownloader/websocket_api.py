@@ -0,0 +1,50 @@
+"""Websocket API of the MyJDownloader integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import ATTR_LINKS, ATTR_PACKAGES, DATA_MYJDOWNLOADER_CLIENT, DOMAIN
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_items)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/items",
+        vol.Required("device_id"): str,
+        vol.Required("kind"): vol.In([ATTR_LINKS, ATTR_PACKAGES]),
+    }
+)
+@callback
+def websocket_items(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return all links or packages of a JDownloader, as the sensors know them."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        hub = entry_data[DATA_MYJDOWNLOADER_CLIENT]
+        if hub is None or (store := hub.stores.get(msg["device_id"])) is None:
+            continue
+        table = getattr(store, msg["kind"])
+        connection.send_result(
+            msg["id"],
+            {msg["kind"]: [table.render(row) for row in range(len(table))]},
+        )
+        return
+
+    connection.send_error(
+        msg["id"],
+        websocket_api.ERR_NOT_FOUND,
+        f"JDownloader ({msg['device_id']}) not found",
+    )
@@ -0,0 +1,137 @@
+"""Fakes of the MyJDownloader cloud and JDownloaders for the hub tests."""
+
+import asyncio
+from types import MethodType
+
+from custom_components.myjdownloader import MyJDownloaderHub
+
+DEVICE_INFOS = [
+    {"id": "device_1", "name": "JDownloader 1", "type": "jd"},
+    {"id": "device_2", "name": "JDownloader 2", "type": "jd"},
+]
+
+
+class FakeJDownloader:
+    """A JDownloader answering the actions the integration sends."""
+
+    def __init__(self):
+        self.calls = []
+        # parameters of the calls of each action
+        self.params = {}
+        self.state = "RUNNING"
+        self.speed_limit = False
+        self.links = [
+            {
+                "uuid": uuid,
+                "packageUUID": 1,
+                "name": f"link {uuid}",
+                "url": f"http://example.org/{uuid}",
+                "bytesTotal": 100,
+                "bytesLoaded": 10,
+                "speed": 5,
+                "running": True,
+                "finished": False,
+            }
+            for uuid in range(1, 4)
+        ]
+        self.packages = [
+            {
+                "uuid": 1,
+                "name": "package",
+                "bytesTotal": 300,
+                "bytesLoaded": 30,
+                "speed": 15,
+                "hosts": ["example.org"],
+                "running": True,
+                "finished": False,
+                "childCount": 3,
+            }
+        ]
+        self.linkgrabber_links = []
+        # exceptions raised by the next calls of an action, None lets one through
+        self.errors = {}
+        # actions waiting for the event to be set before they answer
+        self.gates = {}
+
+    def count(self, path):
+        return self.calls.count(path)
+
+    async def action(self, path, params=None):
+        self.calls.append(path)
+        self.params.setdefault(path, []).append(params)
+        if (gate := self.gates.get(path)) is not None:
+            await gate.wait()
+        if self.errors.get(path) and (error := self.errors[path].pop(0)):
+            raise error
+        if path == "/downloadcontroller/getCurrentState":
+            return self.state
+        if path == "/downloadcontroller/pause":
+            self.state = "PAUSE" if params[0] else "RUNNING"
+            return True
+        if path == "/downloadcontroller/start":
+            self.state = "RUNNING"
+            return True
+        if path == "/downloadcontroller/stop":
+            self.state = "STOPPED_STATE"
+            return True
+        if path == "/downloadcontroller/getSpeedInBps":
+            return 15
+        if path == "/toolbar/getStatus":
+            return {"limit": self.speed_limit}
+        if path == "/toolbar/toggleDownloadSpeedLimit":
+            self.speed_limit = not self.speed_limit
+            return None
+        if path == "/downloadsV2/queryLinks":
+            query = params[0]
+            start_at = query.get("startAt", 0)
+            if (max_results := query.get("maxResults", -1)) == -1:
+                return self.links[start_at:]
+            return self.links[start_at : start_at + max_results]
+        if path == "/downloadsV2/queryPackages":
+            return self.packages
+        if path == "/linkgrabberv2/queryLinks":
+            return self.linkgrabber_links
+        if path == "/linkgrabberv2/addLinks":
+            return {"id": len(self.calls)}
+        if path == "/update/isUpdateAvailable":
+            return False
+        if path == "/jd/getCoreRevision":
+            return 48000
+        if path == "/events/subscribe":
+            return {"subscriptionid": 1}
+        if path == "/events/listen":
+            # no events, the listener keeps polling
+            await asyncio.sleep(3600)
+        return None
+
+
+def make_hub(hass, options=None, entry_id=None):
+    """Return a hub whose cloud and JDownloaders are faked."""
+    hub = MyJDownloaderHub(hass, options, entry_id)
+    hub.fake_devices = {info["id"]: FakeJDownloader() for info in DEVICE_INFOS}
+    hub.list_devices_calls = 0
+    # session methods called on the account
+    hub.session_calls = []
+
+    def connect(myjd, email, password):
+        hub.session_calls.append("connect")
+        return True
+
+    def reconnect(myjd):
+        hub.session_calls.append("reconnect")
+        return True
+
+    hub.myjd.connect = MethodType(connect, hub.myjd)
+    hub.myjd.reconnect = MethodType(reconnect, hub.myjd)
+    hub.myjd.is_connected = lambda: True
+
+    async def list_devices():
+        hub.list_devices_calls += 1
+        return DEVICE_INFOS
+
+    async def async_action(device_id, path, params=None, api=None, timeout=None):
+        return await hub.fake_devices[device_id].action(path, params)
+
+    hub.api.list_devices = list_devices
+    hub.api.async_action = async_action
+    return hub
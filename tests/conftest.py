@@ -0,0 +1,24 @@
+"""Fixtures of the MyJDownloader tests."""
+
+import asyncio
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+
+@pytest.fixture
+def run_with_hass(tmp_path):
+    """Return a runner of coroutine functions taking a Home Assistant instance."""
+
+    def run(test):
+        async def main():
+            hass = HomeAssistant(str(tmp_path))
+            try:
+                return await test(hass)
+            finally:
+                await hass.async_stop(force=True)
+
+        return asyncio.run(main())
+
+    return run
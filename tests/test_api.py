@@ -0,0 +1,73 @@
+"""Tests of the encryption and the sessions of the API transports."""
+
+import json
+from types import SimpleNamespace
+
+from myjdapi import myjdapi as myjdapi_module
+from myjdapi.myjdapi import Myjdapi
+import pytest
+import requests
+
+from custom_components.myjdownloader.api import (
+    BLOCK_SIZE,
+    PooledMyjdapi,
+    _decode,
+    _decrypt,
+    _encrypt,
+    _pad,
+    _unpad,
+)
+
+SECRET_TOKEN = bytes(range(32))
+
+
+@pytest.mark.parametrize("length", [0, 1, BLOCK_SIZE - 1, BLOCK_SIZE, 100])
+def test_pad_round_trip(length):
+    data = b"x" * length
+    padded = _pad(data)
+
+    assert len(padded) % BLOCK_SIZE == 0
+    assert len(padded) > length
+    assert _unpad(padded) == data
+
+
+def test_encrypt_decrypt_round_trip():
+    data = '{"url": "/downloadsV2/queryLinks", "params": ["ä"]}'
+
+    assert _decrypt(SECRET_TOKEN, _encrypt(SECRET_TOKEN, data)) == data.encode()
+
+
+def test_decode_parses_response():
+    response = {"rid": 7, "data": [{"uuid": 1, "name": "link"}]}
+    encrypted = _encrypt(SECRET_TOKEN, json.dumps(response))
+
+    assert _decode(SECRET_TOKEN, encrypted) == response
+
+
+def test_encryption_matches_myjdapi():
+    myjd = Myjdapi()
+    data = json.dumps({"apiVer": 1, "rid": 7})
+    encrypted = _encrypt(SECRET_TOKEN, data)
+
+    assert encrypted == myjd._Myjdapi__encrypt(SECRET_TOKEN, data)
+    assert myjd._Myjdapi__decrypt(SECRET_TOKEN, encrypted) == data.encode()
+
+
+def test_pooled_myjdapi_uses_its_own_session(monkeypatch):
+    myjd = PooledMyjdapi()
+    myjd._Myjdapi__connected = True
+    myjd._Myjdapi__server_encryption_token = SECRET_TOKEN
+    response = {"rid": myjd._Myjdapi__request_id, "list": []}
+    urls = []
+
+    def get(url, **kwargs):
+        urls.append(url)
+        return SimpleNamespace(
+            status_code=200, text=_encrypt(SECRET_TOKEN, json.dumps(response))
+        )
+
+    monkeypatch.setattr(myjd.requests, "get", get)
+
+    assert myjd.request_api("/my/listdevices") == response
+    assert len(urls) == 1 and "/my/listdevices?" in urls[0]
+    assert myjdapi_module.requests is requests
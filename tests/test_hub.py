@@ -0,0 +1,454 @@
+"""Tests of the API call handling of the hub."""
+
+import asyncio
+import time
+from types import MethodType
+
+from myjdapi.exception import (
+    MYJDConnectionException,
+    MYJDSessionException,
+    MYJDTokenInvalidException,
+)
+import pytest
+
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from custom_components import myjdownloader
+from custom_components.myjdownloader import switch
+from custom_components.myjdownloader.api import MyJDownloaderDevice
+from custom_components.myjdownloader.const import (
+    CONF_PACKAGE_FIELDS,
+    DOMAIN,
+    EVENT_SWITCH_FAILED,
+    SNAPSHOT_CORE_REVISION,
+    SNAPSHOT_LIMIT,
+    SNAPSHOT_PACKAGES,
+    SNAPSHOT_PROGRESS,
+    SNAPSHOT_STATE,
+)
+from custom_components.myjdownloader.coordinator import (
+    SNAPSHOT_GROUP_PACKAGES,
+    SNAPSHOT_GROUP_STATUS,
+)
+from custom_components.myjdownloader.sensor import MyJDownloaderStatusSensor
+from custom_components.myjdownloader.switch import MyJDownloaderPauseSwitch
+
+from .common import DEVICE_INFOS, make_hub
+
+ADD_LINKS = "/linkgrabberv2/addLinks"
+PACKAGES = "/downloadsV2/queryPackages"
+PAUSE = "/downloadcontroller/pause"
+STATE = "/downloadcontroller/getCurrentState"
+
+
+def _device(hub):
+    return MyJDownloaderDevice(hub.api, DEVICE_INFOS[0])
+
+
+def test_identical_queries_share_a_call(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        device = _device(hub)
+        fake = hub.fake_devices[device.device_id]
+
+        results = await asyncio.gather(
+            hub.async_query(device.downloadcontroller.get_current_state),
+            hub.async_query(device.downloadcontroller.get_current_state),
+        )
+
+        assert results == ["RUNNING", "RUNNING"]
+        assert fake.count(STATE) == 1
+
+    run_with_hass(test)
+
+
+def test_query_results_are_cached_until_a_command(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        device = _device(hub)
+        fake = hub.fake_devices[device.device_id]
+
+        await hub.async_query(device.downloadcontroller.get_current_state)
+        assert await hub.async_query(device.downloadcontroller.get_current_state) == (
+            "RUNNING"
+        )
+        assert fake.count(STATE) == 1
+
+        await hub.async_query(device.downloadcontroller.pause_downloads, True)
+        assert await hub.async_query(device.downloadcontroller.get_current_state) == (
+            "PAUSE"
+        )
+        assert fake.count(STATE) == 2
+
+    run_with_hass(test)
+
+
+def test_invalidation_drops_inflight_queries(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        device = _device(hub)
+        fake = hub.fake_devices[device.device_id]
+        fake.gates[STATE] = gate = asyncio.Event()
+
+        stale = asyncio.create_task(
+            hub.async_query(device.downloadcontroller.get_current_state)
+        )
+        await asyncio.sleep(0)
+        # the state changes while the first query runs
+        fake.state = "PAUSE"
+        hub.async_handle_events(device.device_id, [])
+        fresh = asyncio.create_task(
+            hub.async_query(device.downloadcontroller.get_current_state)
+        )
+        await asyncio.sleep(0)
+        joined = asyncio.create_task(
+            hub.async_query(device.downloadcontroller.get_current_state)
+        )
+        gate.set()
+        await asyncio.gather(stale, fresh, joined)
+
+        assert fresh.result() == joined.result() == "PAUSE"
+        assert fake.count(STATE) == 2
+        # the result of the stale query was not cached
+        assert await hub.async_query(device.downloadcontroller.get_current_state) == (
+            "PAUSE"
+        )
+        assert fake.count(STATE) == 2
+
+    run_with_hass(test)
+
+
+def test_pending_cache_save_is_not_delayed_again(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass, entry_id="entry")
+        delayed = []
+        hub._storage.async_delay_save = lambda data_func, delay: delayed.append(
+            data_func
+        )
+
+        for _ in range(3):
+            hub.async_schedule_cache_save()
+        assert len(delayed) == 1
+
+        # the store asks for the data when it saves
+        delayed[0]()
+        hub.async_schedule_cache_save()
+        assert len(delayed) == 2
+
+    run_with_hass(test)
+
+
+def test_cache_restores_devices_and_snapshots(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass, entry_id="entry")
+        await hub.async_connect("user@example.org", "password")
+        await hub.async_save_cache()
+
+        restored = make_hub(hass, entry_id="entry")
+        assert await restored.async_load_cache()
+        assert list(restored.devices) == list(hub.devices)
+        assert restored.list_devices_calls == 0
+        for device_id, coordinator in restored.coordinators.items():
+            assert coordinator.data == hub.coordinators[device_id].data
+            assert len(restored.stores[device_id].packages) == 1
+
+        changes = []
+        async_dispatcher_connect(
+            hass, f"{DOMAIN}_devices_changed", callback(lambda: changes.append(True))
+        )
+        await restored.async_reconcile("user@example.org", "password")
+        # the cloud confirmed the restored devices
+        assert restored.list_devices_calls == 1
+        assert changes == [True]
+        assert not restored._restored_device_ids
+
+    run_with_hass(test)
+
+
+def _queried_fields(query):
+    return {key for key, value in query.items() if value is True}
+
+
+def test_package_fields_follow_the_derived_sensors(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass, {CONF_PACKAGE_FIELDS: ["status"]})
+        await hub.async_connect("user@example.org", "password")
+        coordinator = hub.coordinators["device_1"]
+        fake = hub.fake_devices["device_1"]
+        # the first snapshot is computed from all fields
+        assert _queried_fields(fake.params[PACKAGES][-1][0]) == {
+            "bytesLoaded",
+            "bytesTotal",
+            "hosts",
+            "running",
+            "speed",
+            "status",
+        }
+
+        coordinator.async_add_listener(lambda: None, frozenset({SNAPSHOT_PACKAGES}))
+        await coordinator.async_refresh()
+        assert _queried_fields(fake.params[PACKAGES][-1][0]) == {"status"}
+
+        coordinator.async_add_listener(lambda: None, frozenset({SNAPSHOT_PROGRESS}))
+        # the new sensor needs fields the last query left out
+        assert coordinator._dirty_groups == {SNAPSHOT_GROUP_PACKAGES}
+        await coordinator._async_refresh_dirty()
+        assert _queried_fields(fake.params[PACKAGES][-1][0]) == {
+            "bytesLoaded",
+            "bytesTotal",
+            "status",
+        }
+        assert coordinator.data[SNAPSHOT_PROGRESS] == 10.0
+
+    run_with_hass(test)
+
+
+def test_cached_session_is_resumed_without_logging_in(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        hub._session_refreshed_at = time.time()
+
+        assert await hub.async_connect("user@example.org", "password")
+        assert hub.session_calls == []
+        assert list(hub.devices) == [info["id"] for info in DEVICE_INFOS]
+
+    run_with_hass(test)
+
+
+def test_expired_cached_session_logs_in(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        hub._session_refreshed_at = time.time()
+        list_devices = hub.api.list_devices
+        errors = [MYJDTokenInvalidException("TOKEN_INVALID")]
+
+        async def expired_list_devices():
+            if errors:
+                raise errors.pop()
+            return await list_devices()
+
+        def reconnect(myjd):
+            hub.session_calls.append("reconnect")
+            raise MYJDTokenInvalidException("TOKEN_INVALID")
+
+        hub.api.list_devices = expired_list_devices
+        hub.myjd.reconnect = MethodType(reconnect, hub.myjd)
+
+        assert await hub.async_connect("user@example.org", "password")
+        assert hub.session_calls == ["reconnect", "connect"]
+        assert len(hub.devices) == 2
+
+    run_with_hass(test)
+
+
+def test_queries_are_retried_when_unreachable(run_with_hass, monkeypatch):
+    monkeypatch.setattr(myjdownloader, "RETRY_BACKOFF_SECONDS", 0)
+
+    async def test(hass):
+        hub = make_hub(hass)
+        device = _device(hub)
+        fake = hub.fake_devices[device.device_id]
+        fake.errors[STATE] = [MYJDConnectionException("unreachable\n")]
+
+        assert await hub.async_query(device.downloadcontroller.get_current_state) == (
+            "RUNNING"
+        )
+        assert fake.count(STATE) == 2
+
+    run_with_hass(test)
+
+
+def test_commands_are_not_retried(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        device = _device(hub)
+        fake = hub.fake_devices[device.device_id]
+        fake.errors[PAUSE] = [MYJDConnectionException("unreachable\n")]
+
+        with pytest.raises(MYJDConnectionException):
+            await hub.async_query(device.downloadcontroller.pause_downloads, True)
+        assert fake.count(PAUSE) == 1
+        assert fake.state == "RUNNING"
+
+    run_with_hass(test)
+
+
+def test_expired_session_is_renewed_once(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        device = _device(hub)
+        fake = hub.fake_devices[device.device_id]
+        fake.errors[STATE] = [MYJDSessionException("session expired")]
+
+        assert await hub.async_query(device.downloadcontroller.get_current_state) == (
+            "RUNNING"
+        )
+        assert hub.session_calls == ["reconnect"]
+        assert fake.count(STATE) == 2
+
+        fake.errors[PAUSE] = [
+            MYJDSessionException("session expired"),
+            MYJDSessionException("session expired"),
+        ]
+        with pytest.raises(MYJDSessionException):
+            await hub.async_query(device.downloadcontroller.pause_downloads, True)
+        assert hub.session_calls == ["reconnect", "reconnect"]
+        assert fake.count(PAUSE) == 2
+
+    run_with_hass(test)
+
+
+def test_add_links_batch_groups_packages_and_skips_known_links(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        await hub.async_connect("user@example.org", "password")
+        fake = hub.fake_devices["device_1"]
+        fake.linkgrabber_links = [{"uuid": 9, "url": "http://example.org/grabbed"}]
+        sensor = MyJDownloaderStatusSensor(hub, "device_1")
+
+        response = await sensor.add_links_batch(
+            [
+                {
+                    "links": ["http://example.org/a", "http://example.org/grabbed"],
+                    "priority": "high",
+                },
+                {
+                    "links": ["http://example.org/b", "http://example.org/a"],
+                    "priority": "high",
+                },
+                {"links": ["http://example.org/c"], "priority": "low"},
+            ]
+        )
+
+        # packages with the same options share a request
+        assert [params[0]["links"] for params in fake.params[ADD_LINKS]] == [
+            "http://example.org/a\nhttp://example.org/b",
+            "http://example.org/c",
+        ]
+        packages = response["packages"]
+        assert [package["links"] for package in packages] == [1, 1, 1]
+        assert [package["skipped"] for package in packages] == [1, 1, 0]
+        assert packages[0]["job_id"] == packages[1]["job_id"]
+        assert packages[0]["job_id"] != packages[2]["job_id"]
+
+        # links submitted once are skipped afterwards
+        await sensor.add_links(["http://example.org/c"], "default")
+        assert fake.count(ADD_LINKS) == 2
+
+    run_with_hass(test)
+
+
+def test_add_links_batch_forgets_unsent_links_on_error(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        await hub.async_connect("user@example.org", "password")
+        fake = hub.fake_devices["device_1"]
+        sensor = MyJDownloaderStatusSensor(hub, "device_1")
+        packages = [
+            {"links": ["http://example.org/a"], "priority": "high"},
+            {"links": ["http://example.org/b"], "priority": "low"},
+        ]
+        fake.errors[ADD_LINKS] = [None, MYJDConnectionException("unreachable\n")]
+
+        with pytest.raises(MYJDConnectionException):
+            await sensor.add_links_batch(packages)
+
+        urls = hub.stores["device_1"].urls
+        assert "http://example.org/a" in urls
+        assert "http://example.org/b" not in urls
+
+    run_with_hass(test)
+
+
+def test_command_refreshes_only_the_fields_it_changed(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        await hub.async_connect("user@example.org", "password")
+        coordinator = hub.coordinators["device_1"]
+        fake = hub.fake_devices["device_1"]
+        device = hub.get_device("device_1")
+        updated = []
+        for context in (
+            frozenset({SNAPSHOT_LIMIT}),
+            frozenset({SNAPSHOT_STATE}),
+            frozenset({SNAPSHOT_CORE_REVISION}),
+            None,
+        ):
+            coordinator.async_add_listener(
+                lambda context=context: updated.append(context), context
+            )
+
+        await hub.async_query(device.toolbar.enable_downloadSpeedLimit)
+        assert coordinator._dirty_groups == {SNAPSHOT_GROUP_STATUS}
+        calls = len(fake.calls)
+        # refresh without waiting for the debouncer
+        coordinator._dirty_debouncer.async_cancel()
+        await coordinator._async_refresh_dirty()
+
+        assert coordinator.data[SNAPSHOT_LIMIT] is True
+        refreshed = set(fake.calls[calls:])
+        assert "/toolbar/getStatus" in refreshed
+        assert not refreshed & {STATE, PACKAGES, "/jd/getCoreRevision"}
+        assert updated == [frozenset({SNAPSHOT_LIMIT}), None]
+
+    run_with_hass(test)
+
+
+async def _pause_switch(hass, hub):
+    """Return the pause switch of the first JDownloader and its failures."""
+    await hub.async_connect("user@example.org", "password")
+    entity = MyJDownloaderPauseSwitch(hub, "device_1")
+    entity.hass = hass
+    entity.entity_id = "switch.jdownloader_1_pause"
+    entity._handle_coordinator_update()
+    failures = []
+    hass.bus.async_listen(
+        EVENT_SWITCH_FAILED, callback(lambda event: failures.append(event.data))
+    )
+    return entity, failures
+
+
+def test_switch_rolls_back_when_the_command_fails(run_with_hass):
+    async def test(hass):
+        hub = make_hub(hass)
+        entity, failures = await _pause_switch(hass, hub)
+        hub.fake_devices["device_1"].errors[PAUSE] = [
+            MYJDConnectionException("unreachable\n")
+        ]
+
+        await entity.async_turn_on()
+        await hass.async_block_till_done()
+
+        assert not entity.is_on
+        assert entity._pending is None
+        assert failures == [
+            {"entity_id": entity.entity_id, "state": True, "reason": "error"}
+        ]
+
+    run_with_hass(test)
+
+
+def test_switch_rolls_back_when_not_confirmed(run_with_hass, monkeypatch):
+    monkeypatch.setattr(switch, "SWITCH_CONFIRM_SECONDS", 0)
+
+    async def test(hass):
+        hub = make_hub(hass)
+        entity, failures = await _pause_switch(hass, hub)
+        coordinator = hub.coordinators["device_1"]
+
+        await entity.async_turn_on()
+        assert entity.is_on
+        # the JDownloader resumed the downloads before a snapshot confirmed it
+        hub.fake_devices["device_1"].state = "RUNNING"
+        coordinator._dirty_debouncer.async_cancel()
+        await coordinator._async_refresh_dirty()
+        entity._handle_coordinator_update()
+        await hass.async_block_till_done()
+
+        assert not entity.is_on
+        assert failures == [
+            {"entity_id": entity.entity_id, "state": True, "reason": "not_confirmed"}
+        ]
+
+    run_with_hass(test)
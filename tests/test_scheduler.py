@@ -0,0 +1,218 @@
+"""Tests of the priority semaphore and the circuit breaker of the scheduler."""
+
+import asyncio
+
+import pytest
+
+from custom_components.myjdownloader import scheduler
+from custom_components.myjdownloader.scheduler import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    PRIORITY_BACKGROUND,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    CircuitBreaker,
+    _PrioritySemaphore,
+)
+
+
+async def _acquire(semaphore, priority, order, name):
+    await semaphore.acquire(priority)
+    order.append(name)
+
+
+async def _queue(semaphore, waiters):
+    """Start waiters one after another, so they queue in this order."""
+    order = []
+    tasks = []
+    for priority, name in waiters:
+        tasks.append(asyncio.create_task(_acquire(semaphore, priority, order, name)))
+        await asyncio.sleep(0)
+    return order, tasks
+
+
+async def _release_all(semaphore, tasks):
+    for _ in tasks:
+        semaphore.release()
+        await asyncio.sleep(0)
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def run():
+        semaphore = _PrioritySemaphore(1)
+        await semaphore.acquire(PRIORITY_BACKGROUND)
+        order, tasks = await _queue(
+            semaphore,
+            [
+                (PRIORITY_BULK, "bulk"),
+                (PRIORITY_BACKGROUND, "background 1"),
+                (PRIORITY_INTERACTIVE, "interactive"),
+                (PRIORITY_BACKGROUND, "background 2"),
+            ],
+        )
+        assert order == []
+        await _release_all(semaphore, tasks)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == [
+        "interactive",
+        "background 1",
+        "background 2",
+        "bulk",
+    ]
+
+
+def test_free_slots_are_taken_without_waiting():
+    async def run():
+        semaphore = _PrioritySemaphore(2)
+        await semaphore.acquire(PRIORITY_BULK)
+        assert not semaphore.locked()
+        await semaphore.acquire(PRIORITY_BULK)
+        assert semaphore.locked()
+        semaphore.release()
+        assert not semaphore.locked()
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_is_skipped():
+    async def run():
+        semaphore = _PrioritySemaphore(1)
+        await semaphore.acquire(PRIORITY_BACKGROUND)
+        order, tasks = await _queue(
+            semaphore,
+            [(PRIORITY_INTERACTIVE, "cancelled"), (PRIORITY_BULK, "bulk")],
+        )
+        tasks[0].cancel()
+        await asyncio.sleep(0)
+        semaphore.release()
+        await tasks[1]
+        assert tasks[0].cancelled()
+        return order
+
+    assert asyncio.run(run()) == ["bulk"]
+
+
+def test_slot_handed_to_cancelled_waiter_is_passed_on():
+    async def run():
+        semaphore = _PrioritySemaphore(1)
+        await semaphore.acquire(PRIORITY_BACKGROUND)
+        order, tasks = await _queue(
+            semaphore,
+            [(PRIORITY_INTERACTIVE, "cancelled"), (PRIORITY_BULK, "bulk")],
+        )
+        # the slot is handed over, then the waiter is cancelled before it runs
+        semaphore.release()
+        tasks[0].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert tasks[0].cancelled()
+        semaphore.release()
+        assert not semaphore.locked()
+        return order
+
+    assert asyncio.run(run()) == ["bulk"]
+
+
+def test_slot_context_releases_on_error():
+    async def run():
+        semaphore = _PrioritySemaphore(1)
+        try:
+            async with semaphore.slot(PRIORITY_BACKGROUND):
+                assert semaphore.locked()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        assert not semaphore.locked()
+
+    asyncio.run(run())
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time and take the full backoff instead of a jittered one."""
+    clock = _Clock()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock)
+    monkeypatch.setattr(scheduler.random, "uniform", lambda low, high: high)
+    return clock
+
+
+def _open(breaker, threshold=3):
+    opened = [breaker.record_failure() for _ in range(threshold)]
+    assert opened == [False] * (threshold - 1) + [True]
+
+
+def test_breaker_opens_after_threshold_failures(clock):
+    breaker = CircuitBreaker(3, 30, 600)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in == 30
+    assert breaker.as_dict()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(3, 30, 600)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_CLOSED
+
+
+def test_half_open_breaker_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(3, 30, 600)
+    _open(breaker)
+    clock.now += 30
+    assert breaker.state == BREAKER_HALF_OPEN
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.state == BREAKER_HALF_OPEN
+
+
+def test_successful_probe_closes_the_breaker(clock):
+    breaker = CircuitBreaker(3, 30, 600)
+    _open(breaker)
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.allow()
+    assert breaker.retry_in == 0
+
+
+def test_failed_probe_doubles_the_backoff_up_to_the_maximum(clock):
+    breaker = CircuitBreaker(3, 30, 100)
+    _open(breaker)
+    for retry_in in (60, 100, 100):
+        clock.now += breaker.retry_in
+        assert breaker.allow()
+        assert breaker.record_failure()
+        assert breaker.state == BREAKER_OPEN
+        assert breaker.retry_in == retry_in
+
+
+def test_released_probe_can_be_claimed_again(clock):
+    breaker = CircuitBreaker(3, 30, 600)
+    _open(breaker)
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.release()
+    assert breaker.allow()
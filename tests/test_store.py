@@ -0,0 +1,144 @@
+"""Tests of the item table and the URL index of the device store."""
+
+from custom_components.myjdownloader import store
+from custom_components.myjdownloader.store import (
+    MyJDownloaderItemTable,
+    MyJDownloaderUrlIndex,
+)
+
+
+def _link(uuid, package_uuid, **fields):
+    return {
+        "uuid": uuid,
+        "packageUUID": package_uuid,
+        "name": f"link {uuid}",
+        "bytesTotal": 100,
+        **fields,
+    }
+
+
+def _fill(table, items, group_uuids=None):
+    table.start(group_uuids)
+    table.add(items)
+    return table.finish()
+
+
+def test_first_fill_adds_all_items():
+    table = MyJDownloaderItemTable("packageUUID")
+    delta = _fill(table, [_link(1, 10), _link(2, 10), _link(3, 20)])
+
+    assert delta.added == [1, 2, 3]
+    assert delta.updated == [] and delta.removed == []
+    assert len(table) == 3
+    assert table.total("bytesTotal") == 300
+    assert table.group_of(3) == 20
+
+
+def test_refill_reports_updated_and_removed_items():
+    table = MyJDownloaderItemTable("packageUUID")
+    _fill(table, [_link(1, 10), _link(2, 10), _link(3, 20)])
+
+    delta = _fill(table, [_link(1, 10), _link(2, 10, bytesTotal=500), _link(4, 20)])
+
+    assert delta.added == [4]
+    assert delta.updated == [2]
+    assert delta.removed == [3]
+    assert table.total("bytesTotal") == 700
+
+
+def test_unchanged_refill_is_empty():
+    table = MyJDownloaderItemTable("packageUUID")
+    items = [_link(1, 10), _link(2, 20)]
+    _fill(table, items)
+
+    assert not _fill(table, items)
+
+
+def test_partial_refill_keeps_other_packages():
+    table = MyJDownloaderItemTable("packageUUID")
+    _fill(table, [_link(1, 10), _link(2, 10), _link(3, 20)])
+
+    delta = _fill(table, [_link(1, 10, speed=5)], group_uuids=[10])
+
+    assert delta.added == []
+    assert delta.updated == [1]
+    assert delta.removed == [2]
+    assert sorted(record.uuid for record in table.records) == [1, 3]
+    assert table.group_of(3) == 20
+    assert table.total("speed") == 5
+
+
+def test_item_returned_on_two_pages_is_kept_once():
+    table = MyJDownloaderItemTable("packageUUID")
+    table.start()
+    table.add([_link(1, 10), _link(2, 10)])
+    table.add([_link(2, 10, bytesTotal=200)])
+    delta = table.finish()
+
+    assert delta.added == [1, 2]
+    assert len(table) == 2
+    assert table.total("bytesTotal") == 300
+
+
+def test_render_returns_queried_fields_only():
+    table = MyJDownloaderItemTable("packageUUID")
+    _fill(table, [_link(1, 10, url="http://example.org/1", running=True)])
+
+    assert table.render(0) == {
+        "uuid": 1,
+        "name": "link 1",
+        "running": True,
+        "finished": False,
+        "packageUUID": 10,
+        "bytesTotal": 100,
+        "url": "http://example.org/1",
+    }
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_url_index_expires_entries(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(store.time, "monotonic", clock)
+    index = MyJDownloaderUrlIndex(max_size=10, ttl=60)
+
+    index.add(["http://example.org/a"])
+    clock.now += 59
+    assert "http://example.org/a" in index
+    clock.now += 2
+    assert "http://example.org/a" not in index
+    assert len(index) == 0
+
+
+def test_url_index_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(store.time, "monotonic", _Clock())
+    index = MyJDownloaderUrlIndex(max_size=2, ttl=60)
+
+    index.add(["http://example.org/a", "http://example.org/b"])
+    # adding a known URL again makes it the most recently used one
+    index.add(["http://example.org/a"])
+    index.add(["http://example.org/c"])
+
+    assert "http://example.org/a" in index
+    assert "http://example.org/b" not in index
+    assert "http://example.org/c" in index
+    assert len(index) == 2
+
+
+def test_url_index_filter_and_discard(monkeypatch):
+    monkeypatch.setattr(store.time, "monotonic", _Clock())
+    index = MyJDownloaderUrlIndex(max_size=10, ttl=60)
+    index.add(["http://example.org/a"])
+
+    new_urls = index.filter(["http://example.org/a", "http://example.org/b"])
+
+    assert new_urls == ["http://example.org/b"]
+    assert index.as_dict() == {"size": 2, "submitted": 1, "skipped": 1}
+    index.discard(new_urls)
+    assert "http://example.org/b" not in index